@@ -0,0 +1,64 @@
+# Compare routing a move reply through per-game wait_for predicates against the MoveDispatcher.
+# Run from the repository root with: python -m benchmarks.bench_dispatch
+import asyncio
+import time
+from types import SimpleNamespace
+
+from rpsbot.dispatcher import MoveDispatcher
+
+ROUNDS = 2000
+
+
+def make_message(author_id, content="r"):
+    return SimpleNamespace(content=content, guild=None, author=SimpleNamespace(id=author_id),
+                           channel=SimpleNamespace(id=0))
+
+
+# What discord.py does today: every pending listener's check runs against every message
+def predicate_scan(pending_games, message):
+    rps_game = ["rock", "paper", "scissors"]
+    abbreviations = {"r": "rock", "p": "paper", "s": "scissors"}
+    for author_id in pending_games:
+        if message.author.id == author_id and message.guild is None \
+                and message.content.lower() in rps_game + list(abbreviations.keys()):
+            return True
+    return False
+
+
+async def bench_dispatcher(pending):
+    dispatcher = MoveDispatcher()
+    waiters = [asyncio.ensure_future(dispatcher.wait_for_move(author_id, timeout=600)) for author_id in range(pending)]
+    await asyncio.sleep(0)
+
+    # Unrelated chatter that does not match any pending game
+    message = make_message(pending + 1)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        dispatcher.dispatch(message)
+    elapsed = time.perf_counter() - start
+
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    return elapsed / ROUNDS
+
+
+def bench_scan(pending):
+    pending_games = list(range(pending))
+    message = make_message(pending + 1)
+    start = time.perf_counter()
+    for _ in range(ROUNDS if pending < 1000 else ROUNDS // 10):
+        predicate_scan(pending_games, message)
+    return (time.perf_counter() - start) / (ROUNDS if pending < 1000 else ROUNDS // 10)
+
+
+async def main():
+    print(f"{'pending games':>14} {'predicate scan':>16} {'dispatcher':>12}")
+    for pending in (10, 100, 1000, 5000):
+        scan = bench_scan(pending)
+        dispatch = await bench_dispatcher(pending)
+        print(f"{pending:>14} {scan * 1e6:>13.2f} us {dispatch * 1e6:>9.2f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
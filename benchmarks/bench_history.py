@@ -0,0 +1,64 @@
+# Bytes per player of stored history: the original list of (result, opponent) tuples versus a
+# GameHistory at its default capacity, across many players each with the same number of games and
+# with a skewed spread of game counts (most players have played a handful, a few hundreds).
+# Run from the repository root with: python -m benchmarks.bench_history
+import random
+import tracemalloc
+
+from rpsbot.history import HISTORY_SIZE, GameHistory
+
+PLAYERS = 5_000
+GAME_COUNTS = (1, 5, 20, HISTORY_SIZE, 500)
+RESULTS = ("Win", "Loss", "Tie")
+
+
+# Game counts per player from a Pareto distribution: a median of two games and a long tail of regulars
+def spread(rng):
+    return [min(int(rng.paretovariate(1.0)), 1000) for _ in range(PLAYERS)]
+
+
+def games(counts):
+    rng = random.Random(0)
+    # Discord snowflakes are 64-bit IDs, so each opponent is a separately boxed int
+    return [[(rng.choice(RESULTS), rng.randrange(10**17, 10**18)) for _ in range(count)] for count in counts]
+
+
+def measure(build, source):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = build(source)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+    return (after - before) / PLAYERS
+
+
+def build_list(source):
+    # Copy the ints so they are not shared with the generator's lists, as with real history rows
+    return [[(result, int(str(opponent))) for result, opponent in played] for played in source]
+
+
+def build_ring(source):
+    histories = []
+    for played in source:
+        history = GameHistory()
+        for result, opponent in played:
+            history.append(result, opponent)
+        histories.append(history)
+    return histories
+
+
+def report(label, counts):
+    source = games(counts)
+    print(f"{label:>14}: list of tuples {measure(build_list, source):8.0f} B/player | "
+          f"GameHistory {measure(build_ring, source):8.0f} B/player")
+
+
+if __name__ == "__main__":
+    print(f"{PLAYERS} players, GameHistory capacity {HISTORY_SIZE}")
+    for count in GAME_COUNTS:
+        report(f"{count} games each", [count] * PLAYERS)
+    counts = spread(random.Random(1))
+    report("mixed", counts)
+    print(f"mixed spread: median {sorted(counts)[PLAYERS // 2]} games, mean {sum(counts) / PLAYERS:.1f}, "
+          f"max {max(counts)}")
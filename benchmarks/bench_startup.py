@@ -0,0 +1,139 @@
+# Startup cost of the bot by phase (imports, construction, setup_hook) in fresh interpreters, the cost of
+# reloading an extension in place against restarting the bot, and a check that a reload of the game
+# extension keeps a challenge in progress and an open arena round alive.
+# Run from the repository root with: python -m benchmarks.bench_startup
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from rpsbot.fakegateway import FakeGateway, build_bot
+
+# Timed in a fresh interpreter, as the imports are only paid once per process
+COLD_START = """
+import time
+started = time.perf_counter()
+import discord
+discord_imported = time.perf_counter()
+from rpsbot.bot import create_bot
+from rpsbot.config import Config
+imported = time.perf_counter()
+bot = create_bot(Config({"DISCORD_TOKEN": "offline", "METRICS_PORT": "0"}))
+print(discord_imported - started, imported - started, time.perf_counter() - imported)
+"""
+
+
+def median_ms(samples):
+    return statistics.median(samples) * 1000
+
+
+def cold_starts(runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", COLD_START], capture_output=True, text=True, check=True).stdout
+        samples.append([float(value) for value in output.split()])
+    discord_import, imports, construct = zip(*samples)
+    print(f"cold start over {runs} runs: imports {median_ms(imports):.0f} ms "
+          f"(discord.py alone {median_ms(discord_import):.0f} ms) | construct {median_ms(construct):.1f} ms")
+
+
+# setup_hook on a fresh bot each run, then reloading every extension in place on one running bot
+async def reload_against_restart(stats_db, runs):
+    setups = []
+    for run in range(runs):
+        if run:
+            await bot.close()
+        bot = build_bot("2p_rps_bot", stats_db, "lean")
+        await FakeGateway(bot).start()
+        setups.append(bot.startup_timings["setup_hook"])
+    print(f"setup_hook: {median_ms(setups):.1f} ms (state, extensions, metrics endpoint and command sync deferred here)")
+
+    for extension in bot.config.extensions:
+        reloads = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            await bot.reload_extension(extension)
+            reloads.append(time.perf_counter() - started)
+        print(f"reload {extension}: {median_ms(reloads):.1f} ms")
+    await bot.close()
+    print("a restart also pays the cold start above, a fresh IDENTIFY and the guild cache rebuild, "
+          "and drops every game in progress")
+
+
+# Reload the game extension with !reload while a challenge waits on moves and an arena round is open
+async def reload_mid_game(stats_db):
+    bot = build_bot("2p_rps_bot", stats_db, "lean")
+    gateway = FakeGateway(bot)
+    challenger, opponent, host, entrant, owner = (gateway.add_user(name) for name in
+                                                  ("challenger", "opponent", "host", "entrant", "owner"))
+    bot.owner_id = owner
+    waiting = []
+
+    def on_bot_message(channel_id, recipient, content, sent_at):
+        for expected in list(waiting):
+            if expected[0] in (channel_id, recipient) and expected[1] in content:
+                waiting.remove(expected)
+                expected[2].set_result(content)
+
+    # Wait for a message from the bot containing text, in a channel or a user's DMs
+    def expect(where, text):
+        reply = asyncio.get_running_loop().create_future()
+        waiting.append((where, text, reply))
+        return asyncio.wait_for(reply, 15)
+
+    # Send a message and wait for the bot's reply
+    async def exchange(author, content, where, text, channel_id=None, mentions=()):
+        reply = expect(where, text)
+        gateway.send(author, content, channel_id, mentions=mentions)
+        return await reply
+
+    gateway.add_listener(on_bot_message)
+    await gateway.start(channels=3)
+    game_channel, arena_channel, admin_channel = gateway.channel_ids
+
+    # The challenge waits on both players' moves and the arena round on its timer during the reload
+    prompted = asyncio.ensure_future(exchange(challenger, f"!rps <@{opponent}>", opponent, "Please reply",
+                                              game_channel, mentions=[opponent]))
+    await exchange(host, "!rps arena 10", arena_channel, "arena is open", arena_channel)
+    await prompted
+    gateway.send(entrant, "r")
+    old_cog = bot.get_cog("Game")
+
+    reply = await exchange(owner, "!reload game", admin_channel, "Reloaded", admin_channel)
+    assert bot.get_cog("Game") is not old_cog, "the game cog was not replaced"
+    print(f"!reload game mid-game: {reply}")
+
+    await exchange(challenger, "!rps arena", arena_channel, "already running", arena_channel)
+    gateway.send(challenger, "rock")
+    result = await exchange(opponent, "scissors", game_channel, "choice", None)
+    assert "challenger wins!" in result, result
+    print("challenge started before the reload finished after it: challenger wins")
+
+    summary = await expect(arena_channel, "Arena results")
+    assert "(1 players" in summary, summary
+    await exchange(host, "!rps arena results", arena_channel, "Arena results", arena_channel)
+    print("arena round opened before the reload resolved after it with its entrant, "
+          "and the new cog serves its results")
+    await bot.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="samples per measurement")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cold_starts(args.runs)
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(reload_against_restart(os.path.join(tmp, "bench.db"), args.runs))
+        asyncio.run(reload_mid_game(os.path.join(tmp, "reload.db")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Sustained games/sec recording results in memory only versus with the SQLite write-behind store.
+# Run from the repository root with: python -m benchmarks.bench_store
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from rpsbot.leaderboard import LeaderboardIndex
+from rpsbot.store import StatsStore
+
+GAMES = 100_000
+PLAYERS = 5000
+
+
+def play(leaderboard, game_history, store):
+    winner, loser = random.sample(range(1, PLAYERS + 1), 2)
+    leaderboard.record(winner, "wins")
+    leaderboard.record(loser, "losses")
+    game_history.setdefault(winner, []).append(("Win", loser))
+    game_history.setdefault(loser, []).append(("Loss", winner))
+    if store is not None:
+        store.record_stat(winner, "wins")
+        store.record_stat(loser, "losses")
+        store.record_result(winner, "Win", loser)
+        store.record_result(loser, "Loss", winner)
+
+
+async def run(store):
+    leaderboard, game_history = LeaderboardIndex(), {}
+    start = time.perf_counter()
+    for game in range(GAMES):
+        play(leaderboard, game_history, store)
+        # Yield to the loop like a real bot does between games, letting the flush task run
+        if game % 100 == 0:
+            await asyncio.sleep(0)
+    loop_time = time.perf_counter() - start
+    if store is not None:
+        await store.close()
+    return GAMES / loop_time, GAMES / (time.perf_counter() - start)
+
+
+async def main():
+    games_per_sec, _ = await run(None)
+    print(f"persistence off: {games_per_sec:,.0f} games/sec")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StatsStore(os.path.join(tmp, "bench.db"), flush_interval=0.05)
+        await store.open()
+        games_per_sec, with_final_flush = await run(store)
+    print(f"persistence on:  {games_per_sec:,.0f} games/sec on the event loop, "
+          f"{with_final_flush:,.0f} games/sec including the final flush")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
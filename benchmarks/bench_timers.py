@@ -0,0 +1,111 @@
+# Cost of game deadlines at 10k concurrent sessions: an asyncio.wait_for / asyncio.wait timer per game
+# against the shared DeadlineScheduler. That every way a game can end releases its players, moves and
+# deadlines is checked by tests/test_game_lifecycle.py.
+# Run from the repository root with: python -m benchmarks.bench_timers
+import asyncio
+import time
+import tracemalloc
+
+from rpsbot.dispatcher import MoveDispatcher
+from rpsbot.session import GameSession
+
+SESSIONS = 10_000
+SHORT_TIMEOUT = 0.2
+
+
+# The pre-scheduler wait: every pending move owns an asyncio timer
+async def wait_for_move_with_timer(dispatcher, author_id, timeout):
+    future = dispatcher.expect(author_id)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    finally:
+        dispatcher.discard(author_id, future)
+
+
+# The pre-scheduler multiplayer wait: asyncio.wait with a timeout per game
+async def wait_for_pair_with_timer(dispatcher, players, timeout):
+    futures = [dispatcher.expect(player) for player in players]
+    try:
+        await asyncio.wait(futures, timeout=timeout)
+    finally:
+        for player, future in zip(players, futures):
+            dispatcher.discard(player, future)
+
+
+async def scheduled_pair(dispatcher, players, timeout):
+    with GameSession(dispatcher, players, timeout=timeout) as session:
+        try:
+            await session.wait_for_moves()
+        except asyncio.TimeoutError:
+            pass
+
+
+# Start SESSIONS waits, then answer every move; reports setup time, loop timers, memory and total time
+async def bench_resolved(start_wait, players_per_session):
+    dispatcher = MoveDispatcher()
+    loop = asyncio.get_running_loop()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    waiters = [asyncio.ensure_future(start_wait(dispatcher, session)) for session in range(SESSIONS)]
+    await asyncio.sleep(0)
+    setup = time.perf_counter() - started
+    timers = len(loop._scheduled)
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    for session in range(SESSIONS):
+        for player in range(players_per_session):
+            dispatcher.submit(session * players_per_session + player, None, "rock")
+    await asyncio.gather(*waiters, return_exceptions=True)
+    total = time.perf_counter() - started
+    assert not dispatcher and not dispatcher.scheduler
+    return setup, timers, memory / SESSIONS, total
+
+
+# Let SESSIONS waits run out; reports how long after the deadline the last one was noticed
+async def bench_expired(start_wait):
+    dispatcher = MoveDispatcher()
+    waiters = [asyncio.ensure_future(start_wait(dispatcher, session)) for session in range(SESSIONS)]
+    started = time.perf_counter()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    assert not dispatcher and not dispatcher.scheduler
+    return time.perf_counter() - started - SHORT_TIMEOUT
+
+
+def single_with_timer(timeout):
+    return lambda dispatcher, session: wait_for_move_with_timer(dispatcher, session, timeout)
+
+
+def single_scheduled(timeout):
+    return lambda dispatcher, session: dispatcher.wait_for_move(session, timeout=timeout)
+
+
+def pair_with_timer(timeout):
+    return lambda dispatcher, session: wait_for_pair_with_timer(dispatcher, (session * 2, session * 2 + 1), timeout)
+
+
+def pair_scheduled(timeout):
+    return lambda dispatcher, session: scheduled_pair(dispatcher, (session * 2, session * 2 + 1), timeout)
+
+
+async def run_benchmarks():
+    print(f"{SESSIONS:,} concurrent sessions")
+    print(f"{'':>28} {'setup':>9} {'loop timers':>12} {'bytes/game':>11} {'resolve all':>12} {'expiry lag':>11}")
+    cases = (("single, wait_for per game", single_with_timer, 1),
+             ("single, shared scheduler", single_scheduled, 1),
+             ("pair, asyncio.wait per game", pair_with_timer, 2),
+             ("pair, shared scheduler", pair_scheduled, 2))
+    for name, make_wait, players in cases:
+        setup, timers, memory, total = await bench_resolved(make_wait(600), players)
+        lag = await bench_expired(make_wait(SHORT_TIMEOUT))
+        print(f"{name:>28} {setup * 1000:>6.1f} ms {timers:>12,} {memory:>11,.0f} "
+              f"{total * 1000:>9.1f} ms {lag * 1000:>8.1f} ms")
+
+
+def main():
+    asyncio.run(run_benchmarks())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Offline load test: drive the single-player (rps_bot) or multiplayer (2p_rps_bot) bot through a fake gateway and HTTP layer
+# and report games/sec, command-to-result latency, event-loop lag and peak memory.
+# Run from the repository root, e.g.: python -m benchmarks.loadtest --bot 2p_rps_bot --games 5000
+import argparse
+import asyncio
+import os
+import random
+import resource
+import statistics
+import tempfile
+import time
+
+from rpsbot.fakegateway import FakeGateway, build_bot
+
+PROMPT = "Rock 🪨, Paper 📄, or Scissors"
+TIMEOUT_MARKERS = ("took too long",)
+ERROR_MARKERS = ("An error occurred", "Game canceled", "already in")
+RESULT_MARKERS = ("You win!", "I win!", "It's a tie!", " wins!")
+
+
+class Game:
+    def __init__(self, channel_id, players, replies_in_channel):
+        self.channel_id = channel_id
+        self.players = players
+        self.replies_in_channel = replies_in_channel
+        self.started_at = None
+        self.finished_at = None
+        self.outcome = None
+        self.done = asyncio.Event()
+
+    def finish(self, outcome, finished_at):
+        if self.outcome is None:
+            self.outcome = outcome
+            self.finished_at = finished_at
+            self.done.set()
+
+
+class LoadTest:
+    def __init__(self, args, bot):
+        self.args = args
+        self.bot = bot
+        self.gateway = FakeGateway(bot, http_latency=args.http_latency)
+        self.gateway.add_listener(self.on_bot_message)
+        self.games = {}
+        self.player_games = {}
+        self.silent_players = set()
+        self.channel_messages = 0
+        self.dm_messages = 0
+        self.loop_lag = []
+        self.peak_queue_depth = 0
+
+    def reply_later(self, player_id, channel_id=None):
+        if player_id in self.silent_players:
+            return
+        delay = random.uniform(*self.args.reply_delay)
+        move = random.choice(("r", "p", "s", "rock", "paper", "scissors"))
+        asyncio.get_running_loop().call_later(delay, self.gateway.send, player_id, move, channel_id)
+
+    def on_bot_message(self, channel_id, recipient, content, sent_at):
+        if recipient is not None:
+            self.dm_messages += 1
+            if PROMPT in content:
+                self.reply_later(recipient)
+            return
+
+        self.channel_messages += 1
+        game = self.games.get(channel_id)
+        if game is None:
+            return
+        if PROMPT in content and game.replies_in_channel:
+            self.reply_later(game.players[0], channel_id)
+        elif any(marker in content for marker in TIMEOUT_MARKERS):
+            game.finish("timeout", sent_at)
+        elif any(marker in content for marker in ERROR_MARKERS):
+            game.finish("error", sent_at)
+        elif any(marker in content for marker in RESULT_MARKERS):
+            game.finish("played", sent_at)
+
+    async def sample_loop_lag(self, interval=0.02):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            self.loop_lag.append(loop.time() - expected)
+            self.peak_queue_depth = max(self.peak_queue_depth, self.bot.outbox.queue_depth)
+
+    def setup_games(self):
+        multiplayer = self.args.bot == "2p_rps_bot"
+        for channel_id in self.gateway.channel_ids:
+            players = [self.gateway.add_user(f"player-{len(self.player_games)}")]
+            if multiplayer and random.random() < self.args.multiplayer:
+                players.append(self.gateway.add_user(f"player-{len(self.player_games) + 1}"))
+            game = self.games[channel_id] = Game(channel_id, players, replies_in_channel=not multiplayer)
+            for player in players:
+                self.player_games[player] = game
+                if random.random() < self.args.no_reply:
+                    self.silent_players.add(player)
+
+    async def start_game(self, game, delay):
+        await asyncio.sleep(delay)
+        game.started_at = time.perf_counter()
+        if len(game.players) == 2:
+            challenger, opponent = game.players
+            self.gateway.send(challenger, f"!rps <@{opponent}>", game.channel_id, mentions=[opponent])
+        else:
+            self.gateway.send(game.players[0], "!rps", game.channel_id)
+
+    async def run(self):
+        self.bot.config.move_timeout = self.args.timeout
+        await self.gateway.start(channels=self.args.games)
+        self.setup_games()
+
+        sampler = asyncio.create_task(self.sample_loop_lag())
+        started = time.perf_counter()
+        await asyncio.gather(*(self.start_game(game, random.uniform(0, self.args.ramp)) for game in self.games.values()))
+        deadline = self.args.ramp + self.args.timeout + max(self.args.reply_delay) + 10
+        try:
+            await asyncio.wait_for(asyncio.gather(*(game.done.wait() for game in self.games.values())), deadline)
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+
+        await self.bot.close()
+        return elapsed
+
+    def report(self, elapsed):
+        finished = [game for game in self.games.values() if game.outcome is not None]
+        latencies = sorted(game.finished_at - game.started_at for game in finished if game.outcome == "played")
+        outcomes = {outcome: sum(game.outcome == outcome for game in finished)
+                    for outcome in ("played", "timeout", "error")}
+        lag = sorted(self.loop_lag) or [0.0]
+
+        print(f"bot: {self.args.bot} | games: {len(self.games)} "
+              f"({sum(len(game.players) == 2 for game in self.games.values())} multiplayer) | "
+              f"played: {outcomes['played']} | timed out: {outcomes['timeout']} | errors: {outcomes['error']} | "
+              f"unfinished: {len(self.games) - len(finished)}")
+        print(f"throughput: {len(finished) / elapsed:,.1f} games/sec over {elapsed:.2f}s")
+        if latencies:
+            print(f"command-to-result latency: p50 {statistics.median(latencies) * 1000:.1f} ms | "
+                  f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+        print(f"event-loop lag: p50 {statistics.median(lag) * 1000:.2f} ms | "
+              f"p99 {lag[int(len(lag) * 0.99) - 1] * 1000:.2f} ms | max {lag[-1] * 1000:.2f} ms")
+        print(f"messages per game: {self.channel_messages / len(self.games):.2f} channel, "
+              f"{self.dm_messages / len(self.games):.2f} DM | REST calls: {self.gateway.http.calls} | "
+              f"peak outbox queue depth: {self.peak_queue_depth}")
+        print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bot", choices=("rps_bot", "2p_rps_bot"), default="2p_rps_bot")
+    parser.add_argument("--games", type=int, default=2000, help="number of concurrent games")
+    parser.add_argument("--multiplayer", type=float, default=0.5,
+                        help="fraction of 2p_rps_bot games that challenge another player")
+    parser.add_argument("--reply-delay", type=float, nargs=2, default=(0.05, 0.5), metavar=("MIN", "MAX"),
+                        help="range of seconds players take to reply")
+    parser.add_argument("--no-reply", type=float, default=0.0, help="fraction of players who never reply")
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds players have to move")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="seconds per fake REST call")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which games are started")
+    parser.add_argument("--profile", choices=("lean", "full"), default="lean")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        bot = build_bot(args.bot, os.path.join(tmp, "loadtest.db"), args.profile)
+        load_test = LoadTest(args, bot)
+        elapsed = asyncio.run(load_test.run())
+    load_test.report(elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# Offline test of a sharded deployment of the bot: a real state service on a Unix socket and several
+# AutoShardedBot workers, each on its own fake gateway. As on Discord, every DM reaches the worker running
+# shard 0, so moves for games on other workers must be relayed through the state service. Some players
+# are challenged on two workers at once to exercise the shared game locks, and an arena round runs on the
+# last worker while its entrants DM their moves to shard 0.
+# Run from the repository root with: python -m benchmarks.shardtest --workers 4 --games 500
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.loadtest import ERROR_MARKERS, PROMPT, RESULT_MARKERS, TIMEOUT_MARKERS, Game
+from rpsbot.fakegateway import FakeGateway, build_bot
+from rpsbot.stateservice import StateService
+
+BUSY_MARKER = "already in"
+ARENA_SECONDS = 10
+
+
+class Worker:
+    def __init__(self, index, bot):
+        self.index = index
+        self.bot = bot
+        self.gateway = FakeGateway(bot)
+        self.games = {}  # channel ID -> Game
+        self.waiting = []  # (channel ID, text, future) for replies awaited in channels without a game
+
+
+class ShardTest:
+    def __init__(self, args, tmp):
+        self.args = args
+        self.tmp = tmp
+        self.service = StateService(os.path.join(tmp, "state.sock"), os.path.join(tmp, "shardtest.db"))
+        self.workers = []
+        self.users = []
+        self.busy = 0
+        self.relayed = 0
+        self.arena_entrants = []
+
+    async def start_workers(self):
+        await self.service.start()
+        for index in range(self.args.workers):
+            bot = build_bot("2p_rps_bot", os.path.join(self.tmp, "unused.db"), "lean", env={
+                "SHARD_COUNT": str(self.args.workers), "SHARD_IDS": str(index),
+                "STATE_SOCKET": self.service.path, "WORKER_NAME": f"worker-{index}"})
+            bot.config.move_timeout = self.args.timeout
+            worker = Worker(index, bot)
+            worker.gateway.add_listener(lambda *event, worker=worker: self.on_bot_message(worker, *event))
+            # The last channel of each worker is kept free of games for the arena
+            await worker.gateway.start(channels=self.args.games + 1)
+            self.workers.append(worker)
+
+    # Every gateway knows every user, as they would all share the same Discord users
+    def add_users(self, count):
+        dm_gateway = self.workers[0].gateway
+        for number in range(count):
+            user_id = dm_gateway.add_user(f"player-{number}")
+            for worker in self.workers[1:]:
+                worker.gateway.add_user(f"player-{number}", user_id=user_id)
+            self.users.append(user_id)
+
+    def on_bot_message(self, worker, channel_id, recipient, content, sent_at):
+        if recipient is not None:
+            if PROMPT in content and recipient not in self.silent:
+                if worker.index:
+                    self.relayed += 1
+                move = random.choice(("r", "p", "s"))
+                # DMs always arrive on shard 0, whichever worker runs the game
+                asyncio.get_running_loop().call_later(random.uniform(*self.args.reply_delay),
+                                                      self.workers[0].gateway.send, recipient, move)
+            return
+
+        for expected in list(worker.waiting):
+            if expected[0] == channel_id and expected[1] in content:
+                worker.waiting.remove(expected)
+                expected[2].set_result(content)
+
+        game = worker.games.get(channel_id)
+        if game is None:
+            return
+        if BUSY_MARKER in content:
+            self.busy += 1
+            game.finish("busy", sent_at)
+        elif any(marker in content for marker in TIMEOUT_MARKERS):
+            game.finish("timeout", sent_at)
+        elif any(marker in content for marker in ERROR_MARKERS):
+            game.finish("error", sent_at)
+        elif any(marker in content for marker in RESULT_MARKERS):
+            game.finish("played", sent_at)
+
+    def setup_games(self):
+        self.add_users(self.args.workers * self.args.games * 2 + self.args.arena_players)
+        self.arena_entrants = self.users[-self.args.arena_players:] if self.args.arena_players else []
+        players = iter(self.users)
+        self.silent = {user for user in self.users if random.random() < self.args.no_reply}
+        games = []
+        for worker in self.workers:
+            for channel_id in worker.gateway.channel_ids[:-1]:
+                if random.random() < self.args.multiplayer:
+                    game = Game(channel_id, [next(players), next(players)], replies_in_channel=False)
+                else:
+                    game = Game(channel_id, [next(players)], replies_in_channel=False)
+                worker.games[channel_id] = game
+                games.append(game)
+
+        # Challenge some players on another worker while they may already be playing
+        for worker in self.workers:
+            others = [game for other in self.workers if other is not worker for game in other.games.values()]
+            for game in worker.games.values():
+                if len(game.players) == 2 and others and random.random() < self.args.conflicts:
+                    game.players[1] = random.choice(others).players[0]
+
+    async def start_game(self, worker, game, delay):
+        await asyncio.sleep(delay)
+        game.started_at = time.perf_counter()
+        if len(game.players) == 2:
+            challenger, opponent = game.players
+            worker.gateway.send(challenger, f"!rps <@{opponent}>", game.channel_id, mentions=[opponent])
+        else:
+            worker.gateway.send(game.players[0], "!rps", game.channel_id)
+
+    # Send a message in a worker's arena channel and wait for the bot's reply containing text
+    async def arena_exchange(self, worker, author, content, text):
+        reply = asyncio.get_running_loop().create_future()
+        worker.waiting.append((worker.gateway.channel_ids[-1], text, reply))
+        if content:
+            worker.gateway.send(author, content, worker.gateway.channel_ids[-1])
+        return await asyncio.wait_for(reply, ARENA_SECONDS + 10)
+
+    # Open a round on the last worker, check no other worker can open a second one, and have every entrant
+    # DM a move to shard 0; the round must resolve on its own worker with all of them
+    async def run_arena(self):
+        host, arena, other = self.users[0], self.workers[-1], self.workers[0]
+        await self.arena_exchange(arena, host, f"!rps arena {ARENA_SECONDS}", "arena is open")
+        await self.arena_exchange(other, host, "!rps arena", "already running")
+        for entrant in self.arena_entrants:
+            self.workers[0].gateway.send(entrant, random.choice(("r", "p", "s")))
+        summary = await self.arena_exchange(arena, host, None, "Arena results")
+        assert f"({len(self.arena_entrants)} players" in summary, summary.splitlines()[0]
+
+    async def run(self):
+        await self.start_workers()
+        self.setup_games()
+        started = time.perf_counter()
+        arena = asyncio.ensure_future(self.run_arena()) if self.arena_entrants else None
+        games = [(worker, game) for worker in self.workers for game in worker.games.values()]
+        await asyncio.gather(*(self.start_game(worker, game, random.uniform(0, self.args.ramp)) for worker, game in games))
+        try:
+            await asyncio.wait_for(asyncio.gather(*(game.done.wait() for _, game in games)),
+                                   self.args.ramp + self.args.timeout + 10)
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - started
+        if arena is not None:
+            await arena
+
+        for worker in self.workers:
+            await worker.bot.outbox.drain()
+        # Let the last releases reach every worker's mirror
+        await asyncio.sleep(0.1)
+        self.check()
+        for worker in self.workers:
+            await worker.bot.close()
+        await self.service.close()
+        return elapsed
+
+    # Nothing may stay locked, and every played game must be on the shared leaderboard
+    def check(self):
+        assert self.service.state.active_players == 0, f"{self.service.state.active_players} players still locked"
+        for worker in self.workers:
+            assert len(worker.bot.state._owners) == 0, f"worker-{worker.index} still mirrors locked players"
+            assert len(worker.bot.move_dispatcher) == 0, f"worker-{worker.index} still waits on moves"
+
+        played = [game for worker in self.workers for game in worker.games.values() if game.outcome == "played"]
+        expected = sum(len(game.players) for game in played) + len(self.arena_entrants)
+        leaderboard = self.service.state.leaderboard
+        recorded = sum(sum(stats.values()) for _, _, stats in leaderboard.page(1, page_size=max(len(leaderboard), 1)))
+        assert recorded == expected, f"leaderboard has {recorded} results, expected {expected}"
+
+    def report(self, elapsed):
+        games = [game for worker in self.workers for game in worker.games.values()]
+        outcomes = {outcome: sum(game.outcome == outcome for game in games)
+                    for outcome in ("played", "timeout", "busy", "error")}
+        print(f"workers: {len(self.workers)} | games: {len(games)} "
+              f"({sum(len(game.players) == 2 for game in games)} multiplayer) | played: {outcomes['played']} | "
+              f"timed out: {outcomes['timeout']} | rejected as busy: {outcomes['busy']} | errors: {outcomes['error']} | "
+              f"unfinished: {sum(game.outcome is None for game in games)}")
+        print(f"throughput: {sum(game.outcome is not None for game in games) / elapsed:,.1f} games/sec "
+              f"over {elapsed:.2f}s | prompts answered through the shard 0 worker for other workers: {self.relayed}")
+        if self.arena_entrants:
+            print(f"arena on worker-{len(self.workers) - 1}: {len(self.arena_entrants)} entrants DMing shard 0 all "
+                  f"played, second round on worker-0 refused")
+        print("state service: no players locked, worker mirrors empty, leaderboard matches played games")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline sharded deployment test with fake gateways")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--games", type=int, default=300, help="games per worker")
+    parser.add_argument("--multiplayer", type=float, default=0.7, help="fraction of games that challenge a player")
+    parser.add_argument("--conflicts", type=float, default=0.1,
+                        help="fraction of challenges aimed at a player who may be playing on another worker")
+    parser.add_argument("--reply-delay", type=float, nargs=2, default=(0.05, 0.5), metavar=("MIN", "MAX"))
+    parser.add_argument("--no-reply", type=float, default=0.05, help="fraction of players who never reply")
+    parser.add_argument("--timeout", type=float, default=3.0, help="seconds players have to move")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which games are started")
+    parser.add_argument("--arena-players", type=int, default=50,
+                        help="players entering an arena round on the last worker (0 skips the arena)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        shard_test = ShardTest(args, tmp)
+        elapsed = asyncio.run(shard_test.run())
+    shard_test.report(elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Shared building blocks for the rock, paper, scissors bots
@@ -0,0 +1,32 @@
+# Entry point: python -m rpsbot
+import time
+
+STARTED_AT = time.perf_counter()
+
+import asyncio  # noqa: E402
+import sys  # noqa: E402
+
+import discord  # noqa: E402
+
+from rpsbot.bot import create_bot  # noqa: E402
+from rpsbot.config import Config  # noqa: E402
+
+
+# Run the bot until it is stopped; closing it flushes any queued stats to disk.
+# Returns why the bot shut itself down, if it did.
+async def start_bot(config):
+    discord.utils.setup_logging()
+    bot = create_bot(config, started_at=STARTED_AT)
+    async with bot:
+        await bot.start(config.token)
+    return bot.exit_reason
+
+
+def main():
+    config = Config.from_env()
+    config.validate()
+    sys.exit(asyncio.run(start_bot(config)))
+
+
+if __name__ == "__main__":
+    main()
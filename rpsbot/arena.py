@@ -0,0 +1,69 @@
+import random
+
+from rpsbot.dispatcher import RPS_GAME
+from rpsbot.rules import OUTCOMES
+
+ARENA_MODES = ("bot", "pairs")
+ARENA_PAGE_SIZE = 20
+
+# Order results are listed in the summary
+RESULT_ORDER = {"Win": 0, "Tie": 1, "Loss": 2}
+
+
+# One arena round: every player DMs a single move while the window is open, then all moves
+# are resolved at once, either against one bot move or in random pairings (the odd player out
+# plays the bot). Results are (player, move, opponent, opponent_move, result) rows where
+# opponent is None for the bot.
+class ArenaRound:
+    def __init__(self, channel_id, duration, mode="bot"):
+        if mode not in ARENA_MODES:
+            raise ValueError(f"Unknown arena mode {mode!r}, expected one of {', '.join(ARENA_MODES)}")
+        self.channel_id = channel_id
+        self.duration = duration
+        self.mode = mode
+        self.moves = {}
+        self.bot_choice = None
+        self.results = []
+
+    def __len__(self):
+        return len(self.moves)
+
+    # Dispatcher fallback for DM moves no game is waiting on; a player's latest move counts
+    def collect(self, player_id, move):
+        self.moves[player_id] = move
+        return True
+
+    def resolve(self, rng=random):
+        self.bot_choice = rng.choice(RPS_GAME)
+        players = list(self.moves)
+        rows = []
+
+        if self.mode == "pairs":
+            rng.shuffle(players)
+            for player, opponent in zip(players[0::2], players[1::2]):
+                move, opponent_move = self.moves[player], self.moves[opponent]
+                rows.append((player, move, opponent, opponent_move, OUTCOMES[move][opponent_move]))
+                rows.append((opponent, opponent_move, player, move, OUTCOMES[opponent_move][move]))
+            players = players[len(players) // 2 * 2:]
+
+        for player in players:
+            move = self.moves[player]
+            rows.append((player, move, None, self.bot_choice, OUTCOMES[move][self.bot_choice]))
+
+        rows.sort(key=lambda row: RESULT_ORDER[row[4]])
+        self.results = rows
+        return rows
+
+    # Number of players with each result
+    def totals(self):
+        totals = dict.fromkeys(RESULT_ORDER, 0)
+        for row in self.results:
+            totals[row[4]] += 1
+        return totals
+
+    def page_count(self, page_size=ARENA_PAGE_SIZE):
+        return max(-(-len(self.results) // page_size), 1)
+
+    def page(self, page, page_size=ARENA_PAGE_SIZE):
+        start = (page - 1) * page_size
+        return self.results[start:start + page_size]
@@ -0,0 +1,153 @@
+import asyncio
+import time
+
+import discord
+from discord.ext import commands
+
+from rpsbot.dispatcher import MoveDispatcher
+from rpsbot.metrics import BotMetrics
+from rpsbot.names import UserNameCache
+from rpsbot.outbox import Outbox
+from rpsbot.profile import ProfileMeter, bot_options
+
+# Seconds close() waits for queued game messages to be sent before disconnecting
+OUTBOX_DRAIN_TIMEOUT = 10
+
+
+# The rock, paper, scissors bot: shared services live here, while the commands live in extensions
+# (rpsbot/cogs) that can be reloaded in place without dropping the gateway connection.
+# Only cheap objects are built in __init__; the game state, extensions, metrics endpoint and
+# slash command sync are deferred to setup_hook.
+class RPSBot(commands.Bot):
+    def __init__(self, config, started_at=None, **options):
+        self.created_at = time.perf_counter()
+        super().__init__(command_prefix="!", **bot_options(config.profile, measure=config.measure,
+                                                           interactions_only=config.interactions_only), **options)
+        self.config = config
+
+        # In measurement mode, report RSS, gateway events/sec and time-to-ready for the profile
+        if config.measure:
+            ProfileMeter(self, config.profile)
+
+        # Rate-limited, coalescing queue for game messages
+        self.outbox = Outbox()
+
+        # Registry routing move replies to the game waiting on them
+        self.move_dispatcher = MoveDispatcher()
+
+        # Shared cache for resolving user IDs to names
+        self.name_cache = UserNameCache(self)
+
+        # Players in a game, leaderboard stats and game history, opened in setup_hook: kept in this
+        # process, or in the state service shared by every worker of a sharded deployment
+        self.state = None
+
+        # State an extension hands over to its reloaded version, keyed by extension name
+        self.carried_state = {}
+
+        # Why the bot shut itself down, if it did; the process exits with this as its error
+        self.exit_reason = None
+        self._closing = None
+
+        # Seconds spent in each startup phase
+        self.startup_timings = {}
+        if started_at is not None:
+            self.startup_timings["imports"] = self.created_at - started_at
+
+        # Command, REST and event-loop instrumentation served in Prometheus format
+        self.metrics = BotMetrics()
+        self.metrics.install(self)
+        self.metrics.gauge("rps_active_games", "Players currently in a game", lambda: self.state.active_players)
+        self.metrics.gauge("rps_pending_moves", "Players the bot is waiting on for a move",
+                           lambda: len(self.move_dispatcher))
+        self.metrics.gauge("rps_outbox_queue_depth", "Game messages queued for sending", lambda: self.outbox.queue_depth)
+        self.metrics.gauge("rps_stats_write_queue_depth", "Stats writes waiting to be flushed, or on the state service",
+                           lambda: self.state.queue_depth)
+
+    # Open the game state (reloading saved stats, or connecting to the state service), load the
+    # extensions, start the metrics endpoint and sync slash commands before connecting to Discord
+    async def setup_hook(self):
+        started = time.perf_counter()
+        # Imported here so single-process bots never load the state service client, and vice versa
+        if self.config.state_socket:
+            from rpsbot.stateservice import StateClient
+            self.state = StateClient(self.config.state_socket, self.config.worker_name, on_lost=self.state_lost)
+        else:
+            from rpsbot.state import LocalState
+            self.state = LocalState(self.config.stats_db)
+        await self.state.open()
+        self.state.attach(self.move_dispatcher)
+        state_opened = time.perf_counter()
+
+        for extension in self.config.extensions:
+            await self.load_extension(extension)
+        extensions_loaded = time.perf_counter()
+
+        # A taken port costs the metrics endpoint, not the bot
+        if self.config.metrics_port:
+            try:
+                await self.metrics.start(port=self.config.metrics_port)
+            except OSError as e:
+                print(f"Not serving metrics, couldn't listen on port {self.config.metrics_port}: {e}")
+        # Register the slash commands with Discord
+        if self.config.sync_commands:
+            await self.tree.sync()
+
+        self.startup_timings.update(state=state_opened - started, extensions=extensions_loaded - state_opened,
+                                    setup_hook=time.perf_counter() - started)
+
+    # Without the state service a worker can neither start games nor finish the ones it runs (the service
+    # released them when the connection dropped), so shut down and let the launcher restart the worker
+    def state_lost(self):
+        if self.exit_reason is None:
+            self.exit_reason = "Lost the connection to the state service"
+            self._closing = asyncio.create_task(self.close())
+
+    def startup_report(self):
+        return " | ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.startup_timings.items())
+
+    async def on_ready(self):
+        await self.change_presence(activity=discord.Game(name="Rock, Paper, Scissors!"))
+        print(f"{self.user.name} has connected to Discord!")
+        if "ready" not in self.startup_timings:
+            self.startup_timings["ready"] = time.perf_counter() - self.created_at
+            print(f"Startup: {self.startup_report()}")
+
+    # Route move replies to their pending game before falling back to command processing
+    async def on_message(self, message):
+        if self.move_dispatcher.dispatch(message):
+            return
+        await self.process_commands(message)
+
+    # Global error handler to catch unexpected errors
+    async def on_command_error(self, ctx, error):
+        if isinstance(error, commands.CommandNotFound):
+            await ctx.send("That command doesn't exist!")
+        else:
+            await ctx.send(f"An error occurred: {str(error)}")
+
+    # Send the game messages still queued (for a bounded time), unload the extensions, then flush any
+    # queued stats to disk (or disconnect from the state service)
+    async def close(self):
+        closing = not self.is_closed()
+        if closing:
+            try:
+                await asyncio.wait_for(self.outbox.drain(), OUTBOX_DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"Gave up sending queued game messages after {OUTBOX_DRAIN_TIMEOUT}s on shutdown")
+        await super().close()
+        if closing:
+            if self.state is not None:
+                await self.state.close()
+            await self.metrics.stop()
+
+
+class ShardedRPSBot(RPSBot, commands.AutoShardedBot):
+    pass
+
+
+# The bot for the given settings, running only its slice of the shards in a sharded deployment
+def create_bot(config, started_at=None):
+    if config.shard_count:
+        return ShardedRPSBot(config, started_at, shard_count=config.shard_count, shard_ids=config.shard_ids)
+    return RPSBot(config, started_at)
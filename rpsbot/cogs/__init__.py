@@ -0,0 +1 @@
+# discord.py extensions with the bot's commands, each loadable and reloadable on its own
@@ -0,0 +1,27 @@
+import time
+
+from discord.ext import commands
+
+
+# Owner-only maintenance commands
+class Admin(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Swap an extension's code in place, keeping the gateway session and every game in progress.
+    # Extensions hand their own state to their new version through bot.carried_state.
+    @commands.command(name="reload", hidden=True, help="Reload an extension in place: '!reload game'")
+    @commands.is_owner()
+    async def reload(self, ctx, name: str):
+        extension = name if "." in name else f"rpsbot.cogs.{name}"
+        started = time.perf_counter()
+        try:
+            await self.bot.reload_extension(extension)
+        except commands.ExtensionError as e:
+            await ctx.send(f"Couldn't reload {extension}: {e}")
+            return
+        await ctx.send(f"Reloaded {extension} in {(time.perf_counter() - started) * 1000:.0f} ms.")
+
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
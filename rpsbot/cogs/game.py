@@ -0,0 +1,295 @@
+import asyncio
+import random
+from typing import Optional
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from rpsbot.arena import ARENA_MODES, ArenaRound
+from rpsbot.dispatcher import RPS_GAME
+from rpsbot.interactions import BUTTON_PROMPT, handle_move_button, move_buttons
+from rpsbot.registry import PlayersBusy
+from rpsbot.rules import EMOJI_MAP, OUTCOMES
+from rpsbot.session import GameSession
+
+# Bounds for the length of an arena round, in seconds
+ARENA_MIN_SECONDS = 10
+ARENA_MAX_SECONDS = 300
+
+
+# Reply for a game that couldn't start because a player joined another game first, possibly on another shard
+def busy_message(user, opponent, busy):
+    if user.id in busy or opponent is None:
+        return "You are already in an ongoing game! Finish it first."
+    return f"{opponent.name} is already in a game! Try again later."
+
+
+# Single-player games against the bot, challenges between users and the channel-wide arena.
+# Games in progress belong to the bot's move dispatcher and state rather than to the cog,
+# so they run to completion across a reload; the arena rounds are handed to the new cog.
+class Game(commands.Cog):
+    def __init__(self, bot, carried=None):
+        self.bot = bot
+        # The arena round collecting moves, if any, and the last resolved one
+        self.arena_rounds = carried["arena_rounds"] if carried else {"open": None, "last": None}
+
+    # Hand the arena rounds over to the next version of this extension
+    async def cog_unload(self):
+        self.bot.carried_state[__name__] = {"arena_rounds": self.arena_rounds}
+
+    # Reason a challenge can't go ahead, or None if it can
+    def challenge_error(self, challenger, opponent):
+        if opponent.bot:
+            return "You can only challenge the RPS bot or other users, not other bots!"
+        if opponent.id == challenger.id:
+            return "You can't challenge yourself!"
+        if opponent.id in self.bot.state:
+            return f"{opponent.name} is already in a game! Try again later."
+        return None
+
+    # Single-player game against the RPS bot. send_prompt() asks the player for their move;
+    # game_key is None when the move arrives by DM, or the interaction ID when it comes from buttons.
+    async def play_singleplayer(self, channel, player, send_prompt, game_key=None):
+        outbox = self.bot.outbox
+        # The player is released however the game ends, including when their DMs are closed
+        async with self.bot.state.lease((player.id,), "singleplayer"):
+            try:
+                await send_prompt()
+
+                # Wait for the user's move
+                user_choice = await self.bot.move_dispatcher.wait_for_move(player.id, game_key,
+                                                                           timeout=self.bot.config.move_timeout)
+
+            except discord.Forbidden:
+                outbox.send(channel, f"{player.mention}, I couldn't DM you. Please allow DMs from server members and try again.")
+                return
+            except asyncio.TimeoutError:
+                outbox.send(channel, "⏰ You took too long to respond! Please try again.")
+                self.bot.metrics.game_timeouts.inc(1, "singleplayer")
+                return
+
+            # Randomly generate the bot's choice
+            bot_choice = random.choice(RPS_GAME)
+
+            outcome = OUTCOMES[user_choice][bot_choice]
+            if outcome == "Tie":
+                result = "It's a tie!"
+            elif outcome == "Win":
+                result = "You win!"
+            else:
+                result = "I win!"
+            self.bot.state.record_results([(player.id, outcome, None)])
+
+            outbox.send(channel, f"Your choice: {user_choice} {EMOJI_MAP[user_choice]}\n"
+                                 f"My choice: {bot_choice} {EMOJI_MAP[bot_choice]}\n{result}")
+
+    # Multiplayer game between two users. send_prompts() asks both players for their moves;
+    # game_key is None when moves arrive by DM, or the interaction ID when they come from buttons.
+    async def play_multiplayer(self, channel, challenger, opponent, send_prompts, game_key=None):
+        outbox = self.bot.outbox
+        # Both players stay claimed until the game ends, whichever way it ends
+        async with self.bot.state.lease((challenger.id, opponent.id), "multiplayer"):
+            # Announce the challenge
+            outbox.send(
+                channel, f"{opponent.mention}, {challenger.name} has challenged you to Rock, Paper, Scissors! Please check your DM!")
+
+            # Listen for both moves before prompting, so whoever answers first is never missed
+            with GameSession(self.bot.move_dispatcher, (challenger.id, opponent.id),
+                             timeout=self.bot.config.move_timeout, channel_id=game_key) as session:
+                # Prompt both players in parallel
+                try:
+                    await send_prompts()
+                except discord.Forbidden:
+                    session.cancel()
+                    outbox.send(channel, "I couldn't DM one of the players. Game canceled.")
+                    return
+
+                # Both moves share one deadline and the game resolves as soon as the slower player replies
+                try:
+                    moves = await session.wait_for_moves()
+                except asyncio.TimeoutError:
+                    outbox.send(channel, "⏰ One of the players took too long to respond! Game canceled.")
+                    self.bot.metrics.game_timeouts.inc(1, "multiplayer")
+                    return
+
+                user_choice = moves[challenger.id]
+                opponent_choice = moves[opponent.id]
+                session.resolve()
+
+            # Determine the game result
+            outcome = OUTCOMES[user_choice][opponent_choice]
+            if outcome == "Tie":
+                result = "It's a tie!"
+            elif outcome == "Win":
+                result = f"{challenger.name} wins!"
+            else:
+                result = f"{opponent.name} wins!"
+            self.bot.state.record_results([(challenger.id, outcome, opponent.id),
+                                           (opponent.id, OUTCOMES[opponent_choice][user_choice], challenger.id)])
+
+            # Reveal the choices and announce the result in a single message
+            outbox.send(channel, f"{challenger.name}'s choice: {user_choice} {EMOJI_MAP[user_choice]}\n"
+                                 f"{opponent.name}'s choice: {opponent_choice} {EMOJI_MAP[opponent_choice]}\n{result}")
+
+    # Multiplayer rock, paper, scissors game
+    @commands.group(name="rps", invoke_without_command=True,
+                    help="Play rock, paper, scissors (against bot or challenge a user)")
+    async def rps(self, ctx, opponent: discord.Member = None):
+        # Check if a user is already in a game
+        if ctx.author.id in self.bot.state:
+            await ctx.send("You are already in an ongoing game! Finish it first.")
+            return
+
+        # Remember the players' names, as the lean profile keeps no member cache to look them up from later
+        self.bot.name_cache.remember(ctx.author)
+        if opponent:
+            self.bot.name_cache.remember(opponent)
+
+        outbox = self.bot.outbox
+        try:
+            # Single-player logic against the RPS bot, with the move sent by DM
+            if not opponent or opponent.id == self.bot.user.id:
+                prompt = "Rock 🪨, Paper 📄, or Scissors ✂️ (You can also use 'r', 'p', or 's'). Please reply with your choice."
+                await self.play_singleplayer(ctx.channel, ctx.author, lambda: outbox.send(ctx.author, prompt))
+
+            # Multiplayer game logic, with both moves sent by DM
+            else:
+                error = self.challenge_error(ctx.author, opponent)
+                if error:
+                    await ctx.send(error)
+                    return
+
+                prompt = "Please reply with your choice\nRock 🪨, Paper 📄, or Scissors ✂️ (You can also use 'r', 'p', or 's')"
+                await self.play_multiplayer(
+                    ctx.channel, ctx.author, opponent,
+                    lambda: asyncio.gather(outbox.send(ctx.author, prompt), outbox.send(opponent, prompt)))
+
+        # Another shard started a game for one of the players since the checks above
+        except PlayersBusy as e:
+            await ctx.send(busy_message(ctx.author, opponent, e.players))
+
+    # Slash command version of rps, with moves picked through buttons instead of typed messages
+    @app_commands.command(name="rps", description="Play rock, paper, scissors against me or challenge a user")
+    @app_commands.describe(opponent="The user to challenge; leave empty to play against me")
+    async def slash_rps(self, interaction: discord.Interaction, opponent: Optional[discord.Member] = None):
+        user = interaction.user
+        if user.id in self.bot.state:
+            await interaction.response.send_message("You are already in an ongoing game! Finish it first.", ephemeral=True)
+            return
+
+        self.bot.name_cache.remember(user)
+        if opponent:
+            self.bot.name_cache.remember(opponent)
+
+        # Buttons are routed back to this game by the interaction ID in their custom_id
+        view = move_buttons(interaction.id)
+
+        try:
+            # Single-player game, with the move picked from ephemeral buttons
+            if not opponent or opponent.id == self.bot.user.id:
+                await self.play_singleplayer(
+                    interaction.channel, user,
+                    lambda: interaction.response.send_message(BUTTON_PROMPT, view=view, ephemeral=True), interaction.id)
+
+            # Multiplayer game: ephemeral buttons for the challenger and buttons by DM for the opponent
+            else:
+                error = self.challenge_error(user, opponent)
+                if error:
+                    await interaction.response.send_message(error, ephemeral=True)
+                    return
+
+                await self.play_multiplayer(
+                    interaction.channel, user, opponent,
+                    lambda: asyncio.gather(interaction.response.send_message(BUTTON_PROMPT, view=view, ephemeral=True),
+                                           opponent.send(BUTTON_PROMPT, view=view)),
+                    interaction.id)
+
+        except PlayersBusy as e:
+            await interaction.response.send_message(busy_message(user, opponent, e.players), ephemeral=True)
+
+    # Route move button presses to their game
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction):
+        await handle_move_button(interaction, self.bot.move_dispatcher)
+
+    # Render one page of an arena round's results
+    async def arena_summary(self, round_, page=1):
+        rows = round_.page(page)
+        names = await self.bot.name_cache.resolve_many(
+            user_id for player, _, opponent, _, _ in rows for user_id in (player, opponent) if user_id)
+        totals = round_.totals()
+
+        summary = (f"🏟️ **Arena results** ({len(round_)} players, page {page}/{round_.page_count()})\n"
+                   f"{totals['Win']} Wins, {totals['Loss']} Losses, {totals['Tie']} Ties\n")
+        for player, move, opponent, opponent_move, result in rows:
+            player_name = names[player] or f"Unknown User (ID: {player})"
+            if opponent:
+                opponent_name = names[opponent] or f"Unknown User (ID: {opponent})"
+            else:
+                opponent_name = "me"
+            summary += f"{player_name} {EMOJI_MAP[move]} vs {opponent_name} {EMOJI_MAP[opponent_move]}: {result}\n"
+        return summary
+
+    # Channel-wide arena: one prompt, every player DMs a move, and all moves are resolved together
+    @rps.group(name="arena", invoke_without_command=True,
+               help="Open an arena round for everyone: '!rps arena <seconds> [bot|pairs]'")
+    async def rps_arena(self, ctx, seconds: int = 60, mode: str = "bot"):
+        arena_rounds = self.arena_rounds
+        if mode not in ARENA_MODES:
+            await ctx.send(f"Arena mode must be one of: {', '.join(ARENA_MODES)}")
+            return
+        # There is one round at a time across every worker of a sharded deployment, as DMs can't tell rounds apart
+        if not await self.bot.state.open_arena():
+            await ctx.send("An arena round is already running! Join it by DMing me your move.")
+            return
+
+        seconds = min(max(seconds, ARENA_MIN_SECONDS), ARENA_MAX_SECONDS)
+        round_ = ArenaRound(ctx.channel.id, seconds, mode)
+        arena_rounds["open"] = round_
+
+        # DM moves no other game is waiting on join the round, including those relayed from the shard 0 worker
+        def collect_move(player_id, move, author):
+            if author is not None:
+                self.bot.name_cache.remember(author)
+            return round_.collect(player_id, move)
+
+        move_dispatcher = self.bot.move_dispatcher
+        move_dispatcher.fallback = collect_move
+
+        opponents = "me" if mode == "bot" else "a random player"
+        self.bot.outbox.send(
+            ctx.channel, f"🏟️ **The arena is open for {seconds} seconds!** DM me Rock 🪨, Paper 📄, or Scissors ✂️ "
+                         f"('r', 'p', or 's') to play against {opponents}. Your last move counts.")
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            move_dispatcher.fallback = None
+            arena_rounds["open"] = None
+            self.bot.state.close_arena()
+
+        if not round_:
+            self.bot.outbox.send(ctx.channel, "🏟️ Nobody entered the arena this time.")
+            return
+
+        # Apply the whole round's results to the leaderboard and history in one batch
+        self.bot.state.record_results(
+            (player, result, opponent) for player, _, opponent, _, result in round_.resolve())
+        arena_rounds["last"] = round_
+        self.bot.outbox.send(ctx.channel, await self.arena_summary(round_))
+
+    # Command to show another page of the last arena round's results
+    @rps_arena.command(name="results", help="Show a page of the last arena round's results: '!rps arena results 2'")
+    async def rps_arena_results(self, ctx, page: int = 1):
+        round_ = self.arena_rounds["last"]
+        if round_ is None:
+            await ctx.send("No arena round has finished yet.")
+            return
+        if not 1 <= page <= round_.page_count():
+            await ctx.send(f"There are only {round_.page_count()} page(s) of arena results.")
+            return
+        await ctx.send(await self.arena_summary(round_, page))
+
+
+async def setup(bot):
+    await bot.add_cog(Game(bot, bot.carried_state.pop(__name__, None)))
@@ -0,0 +1,43 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+
+# The leaderboard, as a prefix and a slash command
+class Leaderboard(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Render a page of the leaderboard, or explain why it can't be shown
+    async def leaderboard_message(self, page):
+        rows, page_count = await self.bot.state.leaderboard_page(page)
+        if not page_count:
+            return "Leaderboard is empty."
+        if not 1 <= page <= page_count:
+            return f"There are only {page_count} leaderboard page(s)."
+
+        names = await self.bot.name_cache.resolve_many(user_id for _, user_id, _ in rows)
+
+        message = f"🏆 **Leaderboard** 🏆 (page {page}/{page_count})\n"
+        for position, user_id, stats in rows:
+            # Fall back to the ID when the user is invalid or could not be fetched
+            name = names[user_id] or f"Unknown User (ID: {user_id})"
+            message += f"#{position} {name}: {stats['wins']} Wins, {stats['losses']} Losses, {stats['ties']} Ties\n"
+        return message
+
+    # Command to show a page of the leaderboard
+    @commands.command(name="leaderboard", help="Show the leaderboard, optionally a specific page: '!leaderboard 2'")
+    async def show_leaderboard(self, ctx, page: int = 1):
+        await ctx.send(await self.leaderboard_message(page))
+
+    # Slash command version of leaderboard
+    @app_commands.command(name="leaderboard", description="Show the leaderboard")
+    @app_commands.describe(page="Page of the leaderboard to show")
+    async def slash_leaderboard(self, interaction: discord.Interaction, page: int = 1):
+        # Resolving names may take longer than the 3 seconds Discord allows for a first response
+        await interaction.response.defer()
+        await interaction.followup.send(await self.leaderboard_message(page))
+
+
+async def setup(bot):
+    await bot.add_cog(Leaderboard(bot))
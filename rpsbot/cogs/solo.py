@@ -0,0 +1,112 @@
+import asyncio
+import random
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from rpsbot.dispatcher import RPS_GAME
+from rpsbot.interactions import BUTTON_PROMPT, handle_move_button, move_buttons
+from rpsbot.rules import EMOJI_MAP, OUTCOMES
+
+# Define comments for different outcomes with emojis
+TIE_COMMENTS = [
+    "Well, that was awkward... We tied! 🤔",
+    "Great minds think alike... Or maybe we're both just lucky? 😅",
+    "A tie! Guess we're evenly matched! 😎",
+    "It's a stalemate! Let's go again! 🌀",
+    "We tied! Did we just become best friends? 😆"
+]
+
+USER_WIN_COMMENTS = [
+    "No way! You actually beat me! 😱",
+    "Lucky shot, human... Don't get used to it! 😤",
+    "Alright, alright... You win this round! 😒",
+    "You got me this time! Beginner's luck? 😉",
+    "Impressive! But I'm just warming up! 🔥"
+]
+
+BOT_WIN_COMMENTS = [
+    "Haha! I win! Better luck next time! 😜",
+    "Did you really think you could beat me? 🤖",
+    "Nice try, but the bot always wins! 🏆",
+    "Easy win for me! Ready for a rematch? 😏",
+    "You fought bravely, but I prevailed! 💪"
+]
+
+
+# The single-player bot from rps_bot.py: games against the bot played right in the channel,
+# with a comment on every result and no stats kept. An alternative to the game extension.
+class Solo(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Play a game against the bot once send_prompt() has asked the player for their move.
+    # game_key is where the move arrives: the channel ID (None in DMs) for typed replies, or the
+    # interaction ID for buttons.
+    async def play_against_bot(self, channel, player, send_prompt, game_key):
+        outbox = self.bot.outbox
+        # Register the game for the user; it is released however the game ends
+        async with self.bot.state.lease((player.id,), "singleplayer"):
+            await send_prompt()
+
+            # Wait for the user's response
+            try:
+                user_choice = await self.bot.move_dispatcher.wait_for_move(player.id, game_key,
+                                                                           timeout=self.bot.config.move_timeout)
+            except asyncio.TimeoutError:
+                outbox.send(channel, "⏰ You took too long to respond! Please try again.")
+                self.bot.metrics.game_timeouts.inc(1, "singleplayer")
+                return
+
+            bot_choice = random.choice(RPS_GAME)
+
+            # Determine the outcome and select a random comment
+            outcome = OUTCOMES[user_choice][bot_choice]
+            if outcome == "Tie":
+                result = "It's a tie!"
+                comment = random.choice(TIE_COMMENTS)
+            elif outcome == "Win":
+                result = "You win!"
+                comment = random.choice(USER_WIN_COMMENTS)
+            else:
+                result = "I win!"
+                comment = random.choice(BOT_WIN_COMMENTS)
+
+            # Send the results with emojis and a funny comment
+            outbox.send(channel, f"Your choice: {user_choice} {EMOJI_MAP[user_choice]}\n"
+                                 f"My choice: {bot_choice} {EMOJI_MAP[bot_choice]}\n"
+                                 f"{result} {comment}")
+
+    @commands.command(name="rps", help="Play rock, paper, scissors with the bot using '!rps'")
+    async def rps(self, ctx):
+        # Check if the user is already in an active game
+        if ctx.author.id in self.bot.state:
+            await ctx.send("You are already in an ongoing game! Finish it first.")
+            return
+
+        prompt = "Rock 🪨, Paper 📄, or Scissors ✂️ (You can also use 'r', 'p', or 's')"
+        await self.play_against_bot(ctx.channel, ctx.author, lambda: self.bot.outbox.send(ctx.channel, prompt),
+                                    ctx.channel.id if ctx.guild else None)
+
+    # Slash command version of rps, with the move picked through ephemeral buttons
+    @app_commands.command(name="rps", description="Play rock, paper, scissors with the bot")
+    async def slash_rps(self, interaction: discord.Interaction):
+        if interaction.user.id in self.bot.state:
+            await interaction.response.send_message("You are already in an ongoing game! Finish it first.", ephemeral=True)
+            return
+
+        # Buttons are routed back to this game by the interaction ID in their custom_id
+        view = move_buttons(interaction.id)
+        await self.play_against_bot(interaction.channel, interaction.user,
+                                    lambda: interaction.response.send_message(BUTTON_PROMPT, view=view, ephemeral=True),
+                                    interaction.id)
+
+    # Route move button presses to their game
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction):
+        await handle_move_button(interaction, self.bot.move_dispatcher)
+
+
+async def setup(bot):
+    await bot.add_cog(Solo(bot))
@@ -0,0 +1,54 @@
+import discord
+from discord.ext import commands
+
+# Number of recent games listed by the history command
+HISTORY_SHOWN = 20
+
+
+# A player's rank and game history
+class Stats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Command to show a user's position on the leaderboard
+    @commands.command(name="rank", help="Show your leaderboard position, or another user's: '!rank @user'")
+    async def show_rank(self, ctx, member: discord.Member = None):
+        member = member or ctx.author
+        ranking = await self.bot.state.rank(member.id)
+        if ranking is None:
+            await ctx.send(f"{member.name} isn't on the leaderboard yet.")
+            return
+
+        position, ranked, stats = ranking
+        await ctx.send(f"{member.name} is ranked #{position} of {ranked}: "
+                       f"{stats['wins']} Wins, {stats['losses']} Losses, {stats['ties']} Ties")
+
+    # Command to show game history for the user
+    @commands.command(name="history", help="Show your recent games, win rate and streaks")
+    async def show_history(self, ctx):
+        # Only the most recent games are listed so the message stays under Discord's length limit
+        history = await self.bot.state.history(ctx.author.id, HISTORY_SHOWN)
+        if not history:
+            await ctx.send("You have no game history yet.")
+            return
+
+        recent = history["recent"]
+
+        # Resolve every opponent's name in one batched pass
+        names = await self.bot.name_cache.resolve_many(opponent for _, opponent in recent if opponent)
+
+        history_message = (f"**{ctx.author.name}'s Game History** 📜\n"
+                           f"Win rate: {history['win_rate']:.0%} over {history['games_played']} games | "
+                           f"Current streak: {history['current_streak']} | Best streak: {history['best_streak']}\n")
+        for result, opponent in recent:
+            if opponent:
+                opponent_name = names[opponent] or f"Unknown User (ID: {opponent})"
+                history_message += f"Result: {result} against {opponent_name}\n"
+            else:
+                history_message += f"Result: {result} (against bot)\n"
+
+        await ctx.send(history_message)
+
+
+async def setup(bot):
+    await bot.add_cog(Stats(bot))
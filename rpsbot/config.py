@@ -0,0 +1,41 @@
+import os
+
+from dotenv import load_dotenv
+
+# Extensions loaded by default: the games, stats and leaderboard commands and the owner's !reload
+DEFAULT_EXTENSIONS = ("rpsbot.cogs.game", "rpsbot.cogs.stats", "rpsbot.cogs.leaderboard", "rpsbot.cogs.admin")
+
+
+# Bot settings, read from the environment (and .env) when the bot is created rather than at import
+class Config:
+    def __init__(self, environ=None):
+        env = os.environ if environ is None else environ
+        self.token = env.get("DISCORD_TOKEN")
+        self.profile = env.get("BOT_PROFILE", "lean")
+        self.measure = env.get("BOT_MEASURE", "") == "1"
+        # Port to serve Prometheus metrics on (e.g. 9108), off by default so several bots can share a host
+        self.metrics_port = int(env.get("METRICS_PORT", "0"))
+        self.interactions_only = env.get("INTERACTIONS_ONLY", "") == "1"  # Play through slash commands and buttons only
+        self.stats_db = env.get("STATS_DB", "rps_stats.db")
+        self.move_timeout = float(env.get("MOVE_TIMEOUT", "30"))  # Seconds players have to make their moves
+        self.extensions = tuple(name.strip() for name in env.get("BOT_EXTENSIONS", ",".join(DEFAULT_EXTENSIONS)).split(",")
+                                if name.strip())
+        # Set by rpsbot.launcher when running as one worker of a sharded deployment
+        self.shard_count = int(env.get("SHARD_COUNT", "0"))
+        self.shard_ids = [int(shard_id) for shard_id in env.get("SHARD_IDS", "").split(",") if shard_id]
+        self.state_socket = env.get("STATE_SOCKET")
+        self.worker_name = env.get("WORKER_NAME", "worker-0")
+        # Slash commands are global, so only the worker with shard 0 (or the only process) syncs them
+        self.sync_commands = ((self.interactions_only or env.get("SYNC_COMMANDS", "") == "1")
+                              and (not self.shard_ids or 0 in self.shard_ids))
+
+    # Settings from the environment after loading any .env file
+    @classmethod
+    def from_env(cls):
+        load_dotenv()
+        return cls()
+
+    # Ensure the settings needed to connect are present
+    def validate(self):
+        if not self.token:
+            raise ValueError("Missing Discord token in environment variables.")
@@ -0,0 +1,91 @@
+import asyncio
+
+from rpsbot.timers import DeadlineScheduler, expire
+
+# Full choices and every token a player may reply with, precomputed once
+RPS_GAME = ("rock", "paper", "scissors")
+MOVE_TOKENS = {"rock": "rock", "paper": "paper", "scissors": "scissors",
+               "r": "rock", "p": "paper", "s": "scissors"}
+VALID_TOKENS = frozenset(MOVE_TOKENS)
+
+
+# Central registry of players we are waiting on, fed from a single on_message hook.
+# Pending moves are keyed by (author_id, channel_id) where channel_id is None for DMs,
+# so routing a reply to its game is a dict lookup instead of running every game's check.
+# Move deadlines share one DeadlineScheduler rather than an asyncio timer per wait.
+class MoveDispatcher:
+    def __init__(self, scheduler=None):
+        self._pending = {}
+        self.scheduler = scheduler or DeadlineScheduler()
+        # Optional callback(author_id, channel_id, move) handing moves no local game is waiting on to a
+        # game in another process; returns True if it took the move
+        self.relay = None
+        # Optional callback(author_id, move, author) for DM moves no game is waiting on, e.g. an open arena
+        # round; author is the user who sent the move, or None for a move relayed from another process
+        self.fallback = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, key):
+        return key in self._pending
+
+    # Register interest in the player's next valid move; the future resolves to the full choice
+    def expect(self, author_id, channel_id=None):
+        future = asyncio.get_running_loop().create_future()
+        self._pending[(author_id, channel_id)] = future
+        return future
+
+    # Stop waiting on a move registered with expect(), leaving any newer registration alone
+    def discard(self, author_id, future, channel_id=None):
+        key = (author_id, channel_id)
+        if self._pending.get(key) is future:
+            del self._pending[key]
+        future.cancel()
+
+    # Wait for the player's next valid move, returning the full choice ("rock", "paper" or "scissors")
+    async def wait_for_move(self, author_id, channel_id=None, timeout=30):
+        future = self.expect(author_id, channel_id)
+        deadline = self.scheduler.call_later(timeout, expire, future)
+        try:
+            return await future
+        finally:
+            self.scheduler.cancel(deadline)
+            self.discard(author_id, future, channel_id)
+
+    # Route a message to the game waiting on it; returns True if the message was consumed
+    def dispatch(self, message):
+        token = message.content.lower()
+        if token not in VALID_TOKENS:
+            return False
+
+        channel_id = None if message.guild is None else message.channel.id
+        if self.route(message.author.id, channel_id, MOVE_TOKENS[token]):
+            return True
+        return self.collect(message.author.id, channel_id, MOVE_TOKENS[token], message.author)
+
+    # Hand a move to the local game waiting on it, or else to the relay; returns True if either took it
+    def route(self, author_id, channel_id, move):
+        if self.submit(author_id, channel_id, move):
+            return True
+        return self.relay is not None and self.relay(author_id, channel_id, move)
+
+    # Take a move relayed from another process: the local game waiting on it, else the fallback
+    def accept(self, author_id, channel_id, move):
+        return self.submit(author_id, channel_id, move) or self.collect(author_id, channel_id, move)
+
+    # Hand a DM move no game is waiting on to the fallback; returns True if it took the move
+    def collect(self, author_id, channel_id, move, author=None):
+        if self.fallback is None or channel_id is not None:
+            return False
+        return self.fallback(author_id, move, author)
+
+    # Hand a full choice to the game waiting on (author_id, channel_id); returns True if one was waiting.
+    # Button presses use the interaction ID of the game as channel_id.
+    def submit(self, author_id, channel_id, move):
+        future = self._pending.pop((author_id, channel_id), None)
+        if future is None or future.done():
+            return False
+
+        future.set_result(move)
+        return True
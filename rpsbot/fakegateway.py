@@ -0,0 +1,160 @@
+import asyncio
+import itertools
+import time
+
+import discord
+
+from rpsbot.bot import create_bot
+from rpsbot.config import Config
+
+# Extensions each bot loads, as selected by rps_bot.py and 2p_rps_bot.py
+BOT_EXTENSIONS = {"rps_bot": "rpsbot.cogs.solo,rpsbot.cogs.admin", "2p_rps_bot": ""}
+
+# Snowflakes handed out to fake users, channels and messages
+_snowflakes = itertools.count(100_000_000_000_000_000)
+
+
+def next_snowflake():
+    return next(_snowflakes)
+
+
+# A fresh bot with the given bot's extensions for offline runs; extra settings (e.g. a shard slice)
+# may be passed in env
+def build_bot(name, stats_db, profile, env=None):
+    settings = {"DISCORD_TOKEN": "offline", "STATS_DB": stats_db, "BOT_PROFILE": profile, "METRICS_PORT": "0"}
+    if BOT_EXTENSIONS[name]:
+        settings["BOT_EXTENSIONS"] = BOT_EXTENSIONS[name]
+    settings.update(env or {})
+    return create_bot(Config(settings))
+
+
+def user_payload(user_id, name, bot=False):
+    return {"id": str(user_id), "username": name, "discriminator": "0", "global_name": None,
+            "avatar": None, "bot": bot}
+
+
+# Stand-in for discord.py's HTTPClient covering the REST calls the bots make.
+# Each call waits `latency` seconds and reports outgoing messages to the gateway.
+class FakeHTTP:
+    def __init__(self, gateway, latency=0.0):
+        self.gateway = gateway
+        self.latency = latency
+        self.loop = None
+        self.calls = 0
+
+    async def _round_trip(self):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def send_message(self, channel_id, *, params):
+        await self._round_trip()
+        content = params.payload.get("content") or ""
+        data = self.gateway.message_payload(self.gateway.bot_user, channel_id, content)
+        self.gateway.on_bot_message(int(channel_id), content)
+        return data
+
+    async def start_private_message(self, user_id):
+        await self._round_trip()
+        return {"id": str(self.gateway.dm_channel_id(int(user_id))), "type": 1, "last_message_id": None,
+                "recipients": [self.gateway.users[int(user_id)]]}
+
+    async def get_user(self, user_id):
+        await self._round_trip()
+        try:
+            return self.gateway.users[int(user_id)]
+        except KeyError:
+            raise discord.NotFound(FakeResponse(404, "Not Found"), {"code": 10013, "message": "Unknown User"})
+
+    async def close(self):
+        pass
+
+
+class FakeResponse:
+    def __init__(self, status, reason):
+        self.status = status
+        self.reason = reason
+
+
+# Stand-in for the Discord gateway: one guild with text channels, users, and MESSAGE_CREATE events
+# fed straight into the bot's ConnectionState, so commands run exactly as they would when connected.
+class FakeGateway:
+    def __init__(self, bot, http_latency=0.0):
+        self.bot = bot
+        self.state = bot._connection
+        self.http = FakeHTTP(self, http_latency)
+        self.guild_id = next_snowflake()
+        self.users = {}
+        self.dm_channels = {}  # user_id -> DM channel ID
+        self.dm_recipients = {}  # DM channel ID -> user_id
+        self.listeners = []
+        self.events = 0
+
+        self.bot_user = self.add_user("rps-bot", bot=True)
+
+    # Swap in the fake HTTP layer and run the bot's async setup without logging in
+    async def start(self, channels=1):
+        self.bot.http = self.http
+        self.state.http = self.http
+        await self.bot._async_setup_hook()
+        self.state.user = discord.ClientUser(state=self.state, data=self.users[self.bot_user])
+        self.channel_ids = [next_snowflake() for _ in range(channels)]
+        self.state._add_guild_from_data({
+            "id": str(self.guild_id), "name": "load-test", "owner_id": str(self.bot_user),
+            "roles": [{"id": str(self.guild_id), "name": "@everyone", "permissions": "0", "position": 0,
+                       "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [{"id": str(channel_id), "type": 0, "name": f"games-{index}", "position": index,
+                          "guild_id": str(self.guild_id), "permission_overwrites": []}
+                         for index, channel_id in enumerate(self.channel_ids)],
+            "members": [], "member_count": len(self.users), "emojis": [], "stickers": [], "features": [],
+        })
+        await self.bot.setup_hook()
+
+    # Add a user, optionally with a known ID, e.g. the same user seen by another worker's gateway
+    def add_user(self, name, bot=False, user_id=None):
+        user_id = user_id or next_snowflake()
+        self.users[user_id] = user_payload(user_id, name, bot)
+        return user_id
+
+    def dm_channel_id(self, user_id):
+        channel_id = self.dm_channels.get(user_id)
+        if channel_id is None:
+            channel_id = self.dm_channels[user_id] = next_snowflake()
+            self.dm_recipients[channel_id] = user_id
+        return channel_id
+
+    def member_payload(self, user_id):
+        return {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0}
+
+    def message_payload(self, author_id, channel_id, content, guild=False, mentions=()):
+        data = {
+            "id": str(next_snowflake()), "channel_id": str(channel_id), "author": self.users[author_id],
+            "content": content, "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None,
+            "tts": False, "mention_everyone": False, "mention_roles": [], "attachments": [], "embeds": [],
+            "pinned": False, "type": 0, "flags": 0,
+            "mentions": [dict(self.users[user_id], member=self.member_payload(user_id)) for user_id in mentions],
+        }
+        if guild:
+            data["guild_id"] = str(self.guild_id)
+            data["member"] = self.member_payload(author_id)
+        return data
+
+    # Deliver a MESSAGE_CREATE event from a user, in a guild channel or in their DM with the bot
+    def send(self, author_id, content, channel_id=None, mentions=()):
+        self.events += 1
+        if channel_id is None:
+            data = self.message_payload(author_id, self.dm_channel_id(author_id), content)
+        else:
+            data = self.message_payload(author_id, channel_id, content, guild=True, mentions=mentions)
+        self.state.parse_message_create(data)
+
+    # Register a callback(channel_id, recipient_id, content, sent_at) for every message the bot sends;
+    # recipient_id is the user for DMs and None for guild channels
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def on_bot_message(self, channel_id, content):
+        recipient = self.dm_recipients.get(channel_id)
+        sent_at = time.perf_counter()
+        for callback in self.listeners:
+            callback(channel_id, recipient, content, sent_at)
@@ -0,0 +1,68 @@
+from array import array
+
+HISTORY_SIZE = 100
+
+RESULTS = ("Win", "Loss", "Tie")
+RESULT_CODES = {result: code for code, result in enumerate(RESULTS)}
+
+
+# Bounded record of a player's most recent games.
+# Results are packed one byte per game and opponent IDs into an unsigned 64-bit array
+# (0 for games against the bot), with running counters for win rate and streaks.
+# Both arrays grow with the games played, so most players never pay for the full capacity.
+class GameHistory:
+    __slots__ = ("capacity", "_results", "_opponents", "_next", "_count",
+                 "wins", "losses", "ties", "current_streak", "best_streak")
+
+    def __init__(self, capacity=HISTORY_SIZE):
+        self.capacity = capacity
+        self._results = bytearray()
+        self._opponents = array("Q")
+        self._next = 0
+        self._count = 0
+        self.wins = self.losses = self.ties = 0
+        self.current_streak = self.best_streak = 0
+
+    def __len__(self):
+        return self._count
+
+    # Record a game, overwriting the oldest one once the buffer is full
+    def append(self, result, opponent=None):
+        code = RESULT_CODES[result]
+        if self._count < self.capacity:
+            self._results.append(code)
+            self._opponents.append(opponent or 0)
+            self._count += 1
+        else:
+            self._results[self._next] = code
+            self._opponents[self._next] = opponent or 0
+        self._next = (self._next + 1) % self.capacity
+
+        if code == 0:
+            self.wins += 1
+            self.current_streak += 1
+            self.best_streak = max(self.best_streak, self.current_streak)
+        else:
+            self.current_streak = 0
+            if code == 1:
+                self.losses += 1
+            else:
+                self.ties += 1
+
+    # (result, opponent) pairs, oldest first, for the last `limit` games (all retained games by default)
+    def recent(self, limit=None):
+        count = self._count if limit is None else min(limit, self._count)
+        for offset in range(count, 0, -1):
+            index = (self._next - offset) % self.capacity
+            yield RESULTS[self._results[index]], self._opponents[index] or None
+
+    def __iter__(self):
+        return self.recent()
+
+    @property
+    def games_played(self):
+        return self.wins + self.losses + self.ties
+
+    @property
+    def win_rate(self):
+        return self.wins / self.games_played if self.games_played else 0.0
@@ -0,0 +1,42 @@
+import discord
+
+from rpsbot.dispatcher import RPS_GAME
+from rpsbot.rules import EMOJI_MAP
+
+BUTTON_PROMPT = "Rock 🪨, Paper 📄, or Scissors ✂️? Pick your move below."
+
+
+# Rock/Paper/Scissors buttons for a game, with custom_ids of the form "rps:<game_key>:<move>"
+def move_buttons(game_key):
+    view = discord.ui.View(timeout=None)
+    for move in RPS_GAME:
+        view.add_item(discord.ui.Button(label=move.capitalize(), emoji=EMOJI_MAP[move],
+                                        custom_id=f"rps:{game_key}:{move}"))
+    # Presses are routed by custom_id in on_interaction, so keep the view out of discord.py's view store
+    view.stop()
+    return view
+
+
+# (game_key, move) for a move button's custom_id, or None for any other component
+def parse_move_button(custom_id):
+    prefix, _, rest = custom_id.partition(":")
+    game_key, _, move = rest.partition(":")
+    if prefix != "rps" or not game_key.isdigit() or move not in RPS_GAME:
+        return None
+    return int(game_key), move
+
+
+# Route a move button press straight to the game waiting on it; returns True if it was a move button
+async def handle_move_button(interaction, dispatcher):
+    if interaction.type is not discord.InteractionType.component:
+        return False
+    parsed = parse_move_button(interaction.data.get("custom_id", ""))
+    if parsed is None:
+        return False
+
+    game_key, move = parsed
+    if dispatcher.route(interaction.user.id, game_key, move):
+        await interaction.response.edit_message(content=f"You picked {move} {EMOJI_MAP[move]}!", view=None)
+    else:
+        await interaction.response.send_message("This game isn't waiting on a move from you.", ephemeral=True)
+    return True
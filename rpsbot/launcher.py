@@ -0,0 +1,109 @@
+# Sharded deployment of the bot: one state service holding game locks, stats and history,
+# plus N worker processes that each run an AutoShardedBot over a slice of the shards.
+# Run from the repository root with: python -m rpsbot.launcher --workers 4
+import argparse
+import asyncio
+import os
+import signal
+import sys
+
+import aiohttp
+from dotenv import load_dotenv
+
+from rpsbot.stateservice import StateService
+
+GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+
+# Seconds to wait before restarting a worker that exited
+RESTART_DELAY = 5
+
+
+# Split shards 0..shard_count-1 into contiguous slices, one per worker
+def shard_slices(shard_count, workers):
+    workers = min(workers, shard_count)
+    size, extra = divmod(shard_count, workers)
+    slices, start = [], 0
+    for index in range(workers):
+        end = start + size + (index < extra)
+        slices.append(list(range(start, end)))
+        start = end
+    return slices
+
+
+# Number of shards Discord recommends for the bot
+async def recommended_shards(token):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_BOT_URL, headers={"Authorization": f"Bot {token}"}) as response:
+            response.raise_for_status()
+            return (await response.json())["shards"]
+
+
+class Launcher:
+    def __init__(self, shard_count, workers, socket_path, stats_db, metrics_port=0):
+        self.slices = shard_slices(shard_count, workers)
+        self.shard_count = shard_count
+        self.service = StateService(socket_path, stats_db)
+        self.metrics_port = metrics_port
+        self._processes = {}
+        self._stopping = asyncio.Event()
+
+    def worker_env(self, index):
+        return dict(os.environ, SHARD_COUNT=str(self.shard_count), SHARD_IDS=",".join(map(str, self.slices[index])),
+                    STATE_SOCKET=self.service.path, WORKER_NAME=f"worker-{index}",
+                    METRICS_PORT=str(self.metrics_port + index if self.metrics_port else 0))
+
+    # Keep one worker running, restarting it if it exits before shutdown
+    async def _supervise(self, index):
+        while not self._stopping.is_set():
+            process = await asyncio.create_subprocess_exec(sys.executable, "-m", "rpsbot", env=self.worker_env(index))
+            self._processes[index] = process
+            print(f"Started worker-{index} (pid {process.pid}) with shards {self.slices[index]}")
+            code = await process.wait()
+            if self._stopping.is_set():
+                return
+            print(f"worker-{index} exited with code {code}, restarting in {RESTART_DELAY}s")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), RESTART_DELAY)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        self._stopping.set()
+        for process in self._processes.values():
+            if process.returncode is None:
+                process.terminate()
+
+    async def run(self):
+        await self.service.start()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.stop)
+        try:
+            await asyncio.gather(*(self._supervise(index) for index in range(len(self.slices))))
+        finally:
+            # Workers keep no stats of their own, so stopping the service flushes everything to disk
+            await self.service.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the bot as sharded worker processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--shards", type=int, default=0, help="total shard count (default: Discord's recommendation)")
+    parser.add_argument("--socket", default="rps_state.sock", help="Unix socket for the state service")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="metrics port of the first worker, e.g. 9108; the rest use the following ports "
+                             "(default: no metrics endpoint)")
+    return parser.parse_args()
+
+
+async def main():
+    load_dotenv()
+    args = parse_args()
+    shard_count = args.shards or await recommended_shards(os.getenv("DISCORD_TOKEN"))
+    launcher = Launcher(shard_count, args.workers, os.path.abspath(args.socket),
+                        os.getenv("STATS_DB", "rps_stats.db"), args.metrics_port)
+    await launcher.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+import bisect
+
+PAGE_SIZE = 10
+
+
+# Sort key for a player's stats: most wins first, then most ties, then fewest losses
+def rank_key(user_id, stats):
+    return (-stats["wins"], -stats["ties"], stats["losses"], user_id)
+
+
+# Leaderboard stats kept in rank order as they are updated, so a page of the
+# top players or a single player's rank is a binary search rather than a full scan.
+class LeaderboardIndex:
+    def __init__(self):
+        self._stats = {}
+        self._ranked = []
+
+    def __len__(self):
+        return len(self._stats)
+
+    def __contains__(self, user_id):
+        return user_id in self._stats
+
+    def get(self, user_id):
+        return self._stats.get(user_id)
+
+    # Replace the contents with (user_id, wins, losses, ties) rows, e.g. from the stats store
+    def load(self, rows):
+        self._stats = {user_id: {"wins": wins, "losses": losses, "ties": ties} for user_id, wins, losses, ties in rows}
+        self._ranked = sorted(rank_key(user_id, stats) for user_id, stats in self._stats.items())
+
+    # Add one to the player's "wins", "losses" or "ties" and move them to their new position
+    def record(self, user_id, outcome):
+        stats = self._stats.get(user_id)
+        if stats is None:
+            stats = self._stats[user_id] = {"wins": 0, "losses": 0, "ties": 0}
+        else:
+            del self._ranked[bisect.bisect_left(self._ranked, rank_key(user_id, stats))]
+        stats[outcome] += 1
+        bisect.insort(self._ranked, rank_key(user_id, stats))
+
+    # Apply many (user_id, outcome) updates at once, re-sorting once when the batch is large
+    def record_many(self, updates):
+        if len(updates) < 64 or len(updates) * 8 < len(self._ranked):
+            for user_id, outcome in updates:
+                self.record(user_id, outcome)
+            return
+
+        for user_id, outcome in updates:
+            stats = self._stats.setdefault(user_id, {"wins": 0, "losses": 0, "ties": 0})
+            stats[outcome] += 1
+        self._ranked = sorted(rank_key(user_id, stats) for user_id, stats in self._stats.items())
+
+    # 1-based position of the player, or None if they haven't played
+    def rank(self, user_id):
+        stats = self._stats.get(user_id)
+        if stats is None:
+            return None
+        return bisect.bisect_left(self._ranked, rank_key(user_id, stats)) + 1
+
+    def page_count(self, page_size=PAGE_SIZE):
+        return max(-(-len(self._ranked) // page_size), 1)
+
+    # (rank, user_id, stats) rows for a 1-based page of the leaderboard
+    def page(self, page, page_size=PAGE_SIZE):
+        start = (page - 1) * page_size
+        return [(start + offset + 1, key[-1], self._stats[key[-1]])
+                for offset, key in enumerate(self._ranked[start:start + page_size])]
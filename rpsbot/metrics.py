@@ -0,0 +1,233 @@
+import asyncio
+import bisect
+import functools
+import logging
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = [*zip(labelnames, values), *extra]
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        # Unlabelled counters are exported as 0 before their first increment
+        self._values = {} if labelnames else {(): 0}
+
+    def inc(self, amount=1, *labels):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *labels):
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, [("le", bound)])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+# Gauge whose value is read from a callback at scrape time, e.g. lambda: len(active_games)
+class Gauge:
+    def __init__(self, name, help, func):
+        self.name = name
+        self.help = help
+        self.func = func
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {self.func()}"]
+
+
+# Counts the "We are being rate limited" warnings discord.py logs when Discord answers with a 429
+class RateLimitLogHandler(logging.Handler):
+    def __init__(self, counter):
+        super().__init__(logging.WARNING)
+        self.counter = counter
+
+    def emit(self, record):
+        if isinstance(record.msg, str) and record.msg.startswith("We are being rate limited"):
+            self.counter.inc()
+
+
+# Instrumentation for a bot: per-command counters and latency histograms from before/after
+# invoke hooks (and the command tree for slash commands, labelled "/name"), REST call timings,
+# 429s, game timeouts, event-loop lag and gauges for live state, served in Prometheus text
+# format from a local aiohttp server.
+class BotMetrics:
+    def __init__(self):
+        self.metrics = []
+        self.commands = self.add(Counter(
+            "rps_commands_total", "Commands invoked, by command and outcome", ("command", "status")))
+        self.command_duration = self.add(Histogram(
+            "rps_command_duration_seconds", "Time from command invocation to completion", ("command",)))
+        self.game_timeouts = self.add(Counter(
+            "rps_game_timeouts_total", "Games abandoned because a player didn't move in time", ("mode",)))
+        self.rest_calls = self.add(Counter(
+            "rps_rest_calls_total", "Discord REST calls, by route and outcome", ("route", "status")))
+        self.rest_duration = self.add(Histogram(
+            "rps_rest_call_duration_seconds", "Discord REST call latency, including rate limit waits", ("route",)))
+        self.rate_limits = self.add(Counter(
+            "rps_rate_limits_total", "429 responses received from Discord"))
+        self.loop_lag = self.add(Histogram(
+            "rps_event_loop_lag_seconds", "How late the event loop woke the lag sampler",
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)))
+        self._server = None
+        self._sampler = None
+        self._rate_limit_handler = None
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, name, help, func):
+        return self.add(Gauge(name, help, func))
+
+    def render(self):
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+    # Hook into the bot's command framework, command tree, REST client and discord.py's rate limit logging
+    def install(self, bot):
+        bot.before_invoke(self._before_invoke)
+        bot.after_invoke(self._after_invoke)
+        self.instrument_tree(bot)
+        # discord.http's logger is shared by every bot in the process, so stop() takes the handler off again
+        self._rate_limit_handler = RateLimitLogHandler(self.rate_limits)
+        logging.getLogger("discord.http").addHandler(self._rate_limit_handler)
+        self.instrument_http(bot.http)
+
+    async def _before_invoke(self, ctx):
+        ctx.metrics_started_at = time.perf_counter()
+
+    async def _after_invoke(self, ctx):
+        started_at = getattr(ctx, "metrics_started_at", None)
+        if started_at is None:
+            return
+        command = ctx.command.qualified_name
+        self.command_duration.observe(time.perf_counter() - started_at, command)
+        self.commands.inc(1, command, "failed" if ctx.command_failed else "ok")
+
+    # App commands skip the invoke hooks: time them from the tree's interaction check to the
+    # on_app_command_completion event, or to the tree's error handler when they fail
+    def instrument_tree(self, bot):
+        tree = bot.tree
+        interaction_check = tree.interaction_check
+        on_error = tree.on_error
+
+        async def timed_interaction_check(interaction):
+            interaction.extras["metrics_started_at"] = time.perf_counter()
+            return await interaction_check(interaction)
+
+        async def counted_on_error(interaction, error):
+            self._app_command_done(interaction, interaction.command, "failed")
+            await on_error(interaction, error)
+
+        async def on_app_command_completion(interaction, command):
+            self._app_command_done(interaction, command, "ok")
+
+        tree.interaction_check = timed_interaction_check
+        tree.on_error = counted_on_error
+        bot.add_listener(on_app_command_completion, "on_app_command_completion")
+
+    def _app_command_done(self, interaction, command, status):
+        started_at = interaction.extras.pop("metrics_started_at", None)
+        if started_at is None or command is None:
+            return
+        name = f"/{command.qualified_name}"
+        self.command_duration.observe(time.perf_counter() - started_at, name)
+        self.commands.inc(1, name, status)
+
+    # Time every REST call made through the HTTP client, labelled by route template
+    def instrument_http(self, http):
+        request = http.request
+
+        @functools.wraps(request)
+        async def timed_request(route, **kwargs):
+            started_at = time.perf_counter()
+            status = "ok"
+            try:
+                return await request(route, **kwargs)
+            except Exception as e:
+                status = str(getattr(e, "status", "error"))
+                raise
+            finally:
+                self.rest_duration.observe(time.perf_counter() - started_at, route.key)
+                self.rest_calls.inc(1, route.key, status)
+
+        http.request = timed_request
+
+    async def _sample_loop_lag(self, interval):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            self.loop_lag.observe(max(loop.time() - expected, 0))
+
+    async def _handle_metrics(self, request):
+        from aiohttp import web
+        return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+    # Start the loop-lag sampler and serve /metrics on the given local address. aiohttp.web is
+    # imported here rather than at module level: it adds about 50 ms to every startup otherwise.
+    async def start(self, host="127.0.0.1", port=9108, lag_interval=0.5):
+        from aiohttp import web
+        self._sampler = asyncio.create_task(self._sample_loop_lag(lag_interval))
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._server = web.AppRunner(app, access_log=None)
+        await self._server.setup()
+        try:
+            await web.TCPSite(self._server, host, port).start()
+        except OSError:
+            await self._stop_server()
+            raise
+        print(f"Serving metrics on http://{host}:{port}/metrics")
+
+    # Stop serving and take the rate limit handler off discord.http's logger
+    async def stop(self):
+        await self._stop_server()
+        if self._rate_limit_handler is not None:
+            logging.getLogger("discord.http").removeHandler(self._rate_limit_handler)
+            self._rate_limit_handler = None
+
+    # Stop the sampler and the endpoint; a bot whose port was taken keeps counting 429s
+    async def _stop_server(self):
+        if self._sampler is not None:
+            self._sampler.cancel()
+            self._sampler = None
+        if self._server is not None:
+            await self._server.cleanup()
+            self._server = None
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+import discord
+
+
+# Shared user-name lookup for commands that list many players.
+# Names are kept in a bounded LRU cache with a TTL, unknown IDs are cached negatively,
+# concurrent lookups for the same ID share one fetch, and REST fetches are capped by a semaphore.
+class UserNameCache:
+    def __init__(self, bot, maxsize=2048, ttl=3600, negative_ttl=300, max_concurrency=4):
+        self.bot = bot
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()  # user_id -> (name or None, expires_at)
+        self._in_flight = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return False, None
+        name, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return False, None
+        self._entries.move_to_end(user_id)
+        return True, name
+
+    def _store(self, user_id, name, ttl):
+        self._entries[user_id] = (name, time.monotonic() + ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def _fetch(self, user_id):
+        try:
+            async with self._semaphore:
+                user = await self.bot.fetch_user(user_id)
+        except discord.NotFound:
+            self._store(user_id, None, self.negative_ttl)
+            return None
+        except discord.HTTPException as e:
+            print(f"Error fetching user {user_id}: {e}")
+            return None
+        finally:
+            self._in_flight.pop(user_id, None)
+        self._store(user_id, user.name, self.ttl)
+        return user.name
+
+    # Cache the name of a user object we already have, e.g. a message author
+    def remember(self, user):
+        self._store(user.id, user.name, self.ttl)
+
+    # Name for a user ID, or None if the user doesn't exist or couldn't be fetched
+    async def resolve(self, user_id):
+        found, name = self._lookup(user_id)
+        if found:
+            return name
+
+        user = self.bot.get_user(user_id)  # Use cached user info
+        if user is not None:
+            self._store(user_id, user.name, self.ttl)
+            return user.name
+
+        task = self._in_flight.get(user_id)
+        if task is None:
+            task = self._in_flight[user_id] = asyncio.ensure_future(self._fetch(user_id))
+        return await asyncio.shield(task)
+
+    # Resolve a batch of user IDs in one pass, returning {user_id: name or None}
+    async def resolve_many(self, user_ids):
+        unique_ids = list(dict.fromkeys(user_ids))
+        names = await asyncio.gather(*(self.resolve(user_id) for user_id in unique_ids))
+        return dict(zip(unique_ids, names))
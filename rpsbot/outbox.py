@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import discord
+
+MAX_MESSAGE_LENGTH = 2000
+
+
+# Token bucket for one route, e.g. Discord's limit of about 5 messages per 5 seconds per channel
+class RouteBucket:
+    def __init__(self, rate=5, per=5.0):
+        self.rate = rate
+        self.per = per
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    async def acquire(self):
+        self._refill()
+        while self.tokens < 1:
+            await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+            self._refill()
+        self.tokens -= 1
+
+    # Whether the next acquire() would have to wait
+    @property
+    def throttled(self):
+        self._refill()
+        return self.tokens < 1
+
+
+# Merge queued (content, future) pairs into as few messages as possible, each under
+# Discord's length limit, returning (text, futures) for every message to send
+def coalesce(batch, limit=MAX_MESSAGE_LENGTH):
+    chunks, text, futures = [], "", []
+    for content, future in batch:
+        if text and len(text) + 1 + len(content) > limit:
+            chunks.append((text, futures))
+            text, futures = "", []
+        text = f"{text}\n{content}" if text else content
+        futures.append(future)
+    if text:
+        chunks.append((text, futures))
+    return chunks
+
+
+# Outbound messaging layer: callers queue messages and return immediately.
+# Each channel or DM route is drained by its own worker within that route's rate bucket.
+# A route with tokens to spare sends at once; once it is throttled, messages wait out the
+# coalescing window and everything queued meanwhile goes out merged into one message.
+# DM routes send in parallel up to a shared limit.
+class Outbox:
+    def __init__(self, coalesce_window=0.1, rate=5, per=5.0, max_dm_concurrency=8):
+        self.coalesce_window = coalesce_window
+        self.rate = rate
+        self.per = per
+        self._routes = {}  # route -> list of (content, future)
+        self._buckets = {}
+        self._workers = {}
+        self._dm_semaphore = asyncio.Semaphore(max_dm_concurrency)
+        self.messages_queued = 0
+        self.messages_sent = 0
+
+    # Number of queued messages not yet handed to Discord
+    @property
+    def queue_depth(self):
+        return sum(len(queue) for queue in self._routes.values())
+
+    # Queue content for a channel or user; the returned future resolves once it has been sent
+    # and may be awaited (e.g. to catch discord.Forbidden for closed DMs) or ignored
+    def send(self, destination, content):
+        is_dm = isinstance(destination, (discord.User, discord.Member))
+        route = ("dm" if is_dm else "channel", destination.id)
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._routes.setdefault(route, []).append((content, future))
+        self.messages_queued += 1
+
+        if route not in self._workers:
+            self._workers[route] = asyncio.create_task(self._drain(route, destination, is_dm))
+        return future
+
+    async def _drain(self, route, destination, is_dm):
+        bucket = self._buckets.setdefault(route, RouteBucket(self.rate, self.per))
+        try:
+            while self._routes.get(route):
+                if bucket.throttled:
+                    await asyncio.sleep(self.coalesce_window)
+                await bucket.acquire()
+                chunks = coalesce(self._routes.pop(route))
+                for index, (text, futures) in enumerate(chunks):
+                    if index:
+                        await bucket.acquire()
+                    await self._deliver(destination, text, futures, is_dm)
+        finally:
+            del self._workers[route]
+            # Keep the bucket around until it would have refilled, then forget the idle route
+            asyncio.get_running_loop().call_later(self.per, self._forget_bucket, route)
+
+    def _forget_bucket(self, route):
+        if route not in self._workers:
+            self._buckets.pop(route, None)
+
+    async def _deliver(self, destination, text, futures, is_dm):
+        try:
+            if is_dm:
+                async with self._dm_semaphore:
+                    await destination.send(text)
+            else:
+                await destination.send(text)
+        # Besides HTTP errors, discord.py re-raises connection errors and timeouts once its retries
+        # run out; any of them fails this batch only, and the route keeps draining
+        except Exception as e:
+            print(f"Error sending to {destination}: {e!r}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.messages_sent += 1
+        for future in futures:
+            if not future.done():
+                future.set_result(None)
+
+    # Wait until every queued message has been sent
+    async def drain(self):
+        while self._workers:
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+
+# Mark failures as retrieved so ignored futures don't log "exception was never retrieved";
+# _deliver has already reported the error
+def _consume_exception(future):
+    if not future.cancelled():
+        future.exception()
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import resource
+import time
+
+import discord
+
+PROFILES = ("lean", "full")
+
+
+# Intents the commands actually use: guild and DM messages with their content, plus guilds for ctx.guild
+def lean_intents():
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.messages = True
+    intents.message_content = True
+    return intents
+
+
+# The original resource profile, with presences, members and typing events and default caches
+def full_intents():
+    intents = discord.Intents.default()
+    intents.typing = True
+    intents.presences = True
+    intents.messages = True
+    intents.members = True
+    intents.message_content = True
+    return intents
+
+
+# Keyword arguments for commands.Bot for the given resource profile.
+# The lean profile skips member caching, the message cache and guild chunking at startup;
+# members passed to commands are still resolved from the message's mentions or queried on demand.
+# With interactions_only the bot is played through slash commands and buttons alone, so it
+# receives no message events at all.
+def bot_options(profile="lean", measure=False, interactions_only=False):
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown bot profile {profile!r}, expected one of {', '.join(PROFILES)}")
+
+    if profile == "lean":
+        options = {
+            "intents": lean_intents(),
+            "member_cache_flags": discord.MemberCacheFlags.none(),
+            "max_messages": None,
+            "chunk_guilds_at_startup": False,
+        }
+    else:
+        options = {"intents": full_intents()}
+
+    if interactions_only:
+        options["intents"].messages = False
+        options["intents"].message_content = False
+
+    # Gateway event counting relies on the socket_event_type debug event
+    options["enable_debug_events"] = measure
+    return options
+
+
+# Resident set size in MiB, falling back to the peak RSS where /proc isn't available
+def current_rss_mib():
+    try:
+        with open(f"/proc/{os.getpid()}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Measurement mode: periodically report RSS, gateway events/sec and time-to-ready for a profile.
+# Create it before the bot starts so time-to-ready covers login, connect and guild setup.
+class ProfileMeter:
+    def __init__(self, bot, profile, interval=30):
+        self.bot = bot
+        self.profile = profile
+        self.interval = interval
+        self.started_at = time.perf_counter()
+        self.ready_after = None
+        self.events = 0
+        self._task = None
+        bot.add_listener(self.on_socket_event_type)
+        bot.add_listener(self.on_ready)
+
+    async def on_socket_event_type(self, event_type):
+        self.events += 1
+
+    async def on_ready(self):
+        if self.ready_after is None:
+            self.ready_after = time.perf_counter() - self.started_at
+            self._task = asyncio.create_task(self._report_periodically())
+
+    def report(self, events_per_sec):
+        print(f"[{self.profile} profile] ready in {self.ready_after:.2f}s | "
+              f"RSS {current_rss_mib():.1f} MiB | {events_per_sec:.1f} gateway events/sec")
+
+    async def _report_periodically(self):
+        self.report(0.0)
+        while True:
+            events, started = self.events, time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.report((self.events - events) / (time.perf_counter() - started))
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+# Longest a game may hold its players before the sweeper reclaims them, in seconds
+MAX_SESSION_AGE = 600
+
+
+# Raised when claiming players who are already in a game
+class PlayersBusy(RuntimeError):
+    def __init__(self, players):
+        super().__init__(f"Players {players} are already in a game")
+        self.players = players
+
+
+# A claim on one game's players. Used as a context manager, the players are released however
+# the game ends: with a result, a timeout, discord.Forbidden, any other exception or cancellation.
+class Lease:
+    __slots__ = ("registry", "players", "kind", "expires_at", "released")
+
+    def __init__(self, registry, players, kind, expires_at):
+        self.registry = registry
+        self.players = players
+        self.kind = kind
+        self.expires_at = expires_at
+        self.released = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.release(self)
+        return False
+
+
+# Single owner of which players are in a game (replacing the per-mode active_games dicts).
+# Games claim their players up front and the registry releases them when the game's `with` block exits;
+# a periodic sweeper reclaims any lease older than its max age as a safety net.
+class SessionRegistry:
+    def __init__(self, max_age=MAX_SESSION_AGE):
+        self.max_age = max_age
+        self._leases = {}  # player_id -> Lease
+        self._sweeper = None
+        self.swept = 0
+        # Optional callback(lease) run whenever a lease is released, e.g. to tell other processes
+        self.on_release = None
+
+    # Number of players currently in a game
+    def __len__(self):
+        return len(self._leases)
+
+    def __contains__(self, player_id):
+        return player_id in self._leases
+
+    # The lease holding the player, or None if they aren't in a game
+    def get(self, player_id):
+        return self._leases.get(player_id)
+
+    # The kind of game ("singleplayer", "multiplayer", ...) the player is in, or None
+    def kind_of(self, player_id):
+        lease = self._leases.get(player_id)
+        return None if lease is None else lease.kind
+
+    # Mark the players as in a game, raising PlayersBusy if any of them already is
+    def claim(self, players, kind, max_age=None):
+        players = tuple(players)
+        busy = [player for player in players if player in self._leases]
+        if busy:
+            raise PlayersBusy(busy)
+
+        lease = Lease(self, players, kind, time.monotonic() + (max_age or self.max_age))
+        for player in players:
+            self._leases[player] = lease
+        return lease
+
+    def release(self, lease):
+        if lease.released:
+            return
+        lease.released = True
+        for player in lease.players:
+            if self._leases.get(player) is lease:
+                del self._leases[player]
+        if self.on_release is not None:
+            self.on_release(lease)
+
+    # Release every lease past its max age; returns how many were reclaimed
+    def sweep(self, now=None):
+        now = time.monotonic() if now is None else now
+        expired = {lease for lease in self._leases.values() if lease.expires_at <= now}
+        for lease in expired:
+            print(f"Reclaiming stale {lease.kind} game for players {list(lease.players)}")
+            self.release(lease)
+        self.swept += len(expired)
+        return len(expired)
+
+    async def _sweep_periodically(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def start_sweeper(self, interval=60):
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_periodically(interval))
+
+    def stop_sweeper(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
@@ -0,0 +1,14 @@
+from rpsbot.dispatcher import RPS_GAME
+
+EMOJI_MAP = {"rock": "🪨", "paper": "📄", "scissors": "✂️"}
+
+# Precomputed 3x3 outcome table: OUTCOMES[move][other] is "Win", "Loss" or "Tie" for the player of `move`.
+# Each choice beats the one before it in RPS_GAME, so the result only depends on the index difference.
+OUTCOMES = {
+    move: {other: ("Tie", "Win", "Loss")[(index - other_index) % 3]
+           for other_index, other in enumerate(RPS_GAME)}
+    for index, move in enumerate(RPS_GAME)
+}
+
+# Leaderboard column updated for each result
+RESULT_STATS = {"Win": "wins", "Loss": "losses", "Tie": "ties"}
@@ -0,0 +1,110 @@
+import asyncio
+import enum
+
+
+class GameState(enum.Enum):
+    CHALLENGED = "challenged"
+    AWAITING_MOVES = "awaiting_moves"
+    RESOLVED = "resolved"
+    EXPIRED = "expired"
+    CANCELLED = "cancelled"
+
+
+# States each state may move to; resolved, expired and cancelled are final
+TRANSITIONS = {
+    GameState.CHALLENGED: {GameState.AWAITING_MOVES, GameState.CANCELLED},
+    GameState.AWAITING_MOVES: {GameState.RESOLVED, GameState.EXPIRED, GameState.CANCELLED},
+    GameState.RESOLVED: set(),
+    GameState.EXPIRED: set(),
+    GameState.CANCELLED: set(),
+}
+
+
+# A single match between players whose moves arrive by DM, or by button press when channel_id is
+# the interaction ID the buttons were created for.
+# Moves for every player are collected concurrently against one shared deadline,
+# so the match resolves as soon as the last move arrives.
+class GameSession:
+    def __init__(self, dispatcher, players, timeout=30, channel_id=None):
+        self.dispatcher = dispatcher
+        self.channel_id = channel_id
+        self.players = tuple(players)
+        self.timeout = timeout
+        self.state = GameState.CHALLENGED
+        self.moves = {}
+        self.deadline = None
+        self._futures = {}
+        self._finished = None
+        self._waiting = 0
+        self._timer = None
+
+    def _transition(self, state):
+        if state not in TRANSITIONS[self.state]:
+            raise RuntimeError(f"Cannot move game from {self.state.value} to {state.value}")
+        self.state = state
+
+    # Start listening for every player's move; call before sending the prompts so fast replies aren't missed
+    def open(self):
+        self._transition(GameState.AWAITING_MOVES)
+        loop = asyncio.get_running_loop()
+        self.deadline = loop.time() + self.timeout
+        self._futures = {player: self.dispatcher.expect(player, self.channel_id) for player in self.players}
+        # Resolves once every player has moved or the deadline (on the dispatcher's shared scheduler) passes
+        self._finished = loop.create_future()
+        self._waiting = len(self._futures)
+        for future in self._futures.values():
+            future.add_done_callback(self._on_move)
+        self._timer = self.dispatcher.scheduler.call_later(self.timeout, self._finish)
+
+    # `with GameSession(...) as session:` opens the game and cancels it if the block exits while still
+    # waiting on moves, so an unexpected error never leaves moves pending or a deadline scheduled
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.state is GameState.AWAITING_MOVES:
+            self.cancel()
+        return False
+
+    def _on_move(self, future):
+        self._waiting -= 1
+        if not self._waiting:
+            self._finish()
+
+    def _finish(self):
+        if not self._finished.done():
+            self._finished.set_result(None)
+
+    def _release(self):
+        if self._timer is not None:
+            self.dispatcher.scheduler.cancel(self._timer)
+        for player, future in self._futures.items():
+            if future.done() and not future.cancelled():
+                self.moves[player] = future.result()
+            self.dispatcher.discard(player, future, self.channel_id)
+        self._futures = {}
+
+    # Wait until every player has moved or the shared deadline passes (raises asyncio.TimeoutError)
+    async def wait_for_moves(self):
+        try:
+            await self._finished
+        finally:
+            if self.state is GameState.AWAITING_MOVES:
+                self._release()
+
+        if self.missing_players():
+            self._transition(GameState.EXPIRED)
+            raise asyncio.TimeoutError
+        return self.moves
+
+    # Players who had not moved when the game expired or was cancelled
+    def missing_players(self):
+        return [player for player in self.players if player not in self.moves]
+
+    def resolve(self):
+        self._transition(GameState.RESOLVED)
+
+    def cancel(self):
+        self._release()
+        self._transition(GameState.CANCELLED)
@@ -0,0 +1,121 @@
+import contextlib
+
+from rpsbot.history import GameHistory, HISTORY_SIZE
+from rpsbot.leaderboard import LeaderboardIndex
+from rpsbot.registry import SessionRegistry
+from rpsbot.rules import RESULT_STATS
+from rpsbot.store import StatsStore
+
+
+# Game locks, leaderboard stats and history for a bot running as a single process.
+# StateClient in rpsbot/stateservice.py offers the same methods backed by a state service
+# shared between worker processes, so the bot's commands work unchanged in either mode.
+class LocalState:
+    def __init__(self, stats_db):
+        self.sessions = SessionRegistry()
+        self.leaderboard = LeaderboardIndex()
+        self.game_history = {}  # user_id -> GameHistory
+        self.store = StatsStore(stats_db)
+        # Whether an arena round is open; there is one at a time, whichever channel it runs in
+        self.arena_open = False
+
+    # Whether the player is in a game
+    def __contains__(self, player_id):
+        return player_id in self.sessions
+
+    # Number of players in a game
+    @property
+    def active_players(self):
+        return len(self.sessions)
+
+    # Number of stats writes waiting to be flushed
+    @property
+    def queue_depth(self):
+        return self.store.queue_depth
+
+    # Open the stats store, reload saved stats and history and start the stale-game sweeper
+    async def open(self):
+        await self.store.open()
+        stats = await self.store.load_stats()
+        self.leaderboard.load(stats)
+        for user_id, result, opponent in await self.store.load_history(HISTORY_SIZE):
+            self._append_history(user_id, result, opponent)
+        # Only the last HISTORY_SIZE games are replayed, so the win rate comes from the full totals and the
+        # streaks from their saved values rather than from the replayed games
+        for user_id, wins, losses, ties in stats:
+            history = self.game_history.get(user_id)
+            if history is not None:
+                history.wins, history.losses, history.ties = wins, losses, ties
+        for user_id, current_streak, best_streak in await self.store.load_streaks():
+            history = self.game_history.get(user_id)
+            if history is not None:
+                history.current_streak, history.best_streak = current_streak, best_streak
+        self.sessions.start_sweeper()
+
+    # Stop the sweeper and flush any queued stats to disk
+    async def close(self):
+        self.sessions.stop_sweeper()
+        await self.store.close()
+
+    # Moves only arrive in this process, so there is nothing to relay
+    def attach(self, dispatcher):
+        pass
+
+    # Hold the players for the length of an `async with` block, raising PlayersBusy if any is in a game
+    @contextlib.asynccontextmanager
+    async def lease(self, players, kind):
+        with self.sessions.claim(players, kind) as lease:
+            yield lease
+
+    # Claim the arena for a new round; returns False if a round is already open
+    async def open_arena(self):
+        if self.arena_open:
+            return False
+        self.arena_open = True
+        return True
+
+    def close_arena(self):
+        self.arena_open = False
+
+    def _append_history(self, user_id, result, opponent):
+        history = self.game_history.get(user_id)
+        if history is None:
+            history = self.game_history[user_id] = GameHistory()
+        history.append(result, opponent)
+        return history
+
+    # Apply (player, result, opponent) rows to the leaderboard, history and stats store in one batch;
+    # opponent is None for games against the bot
+    def record_results(self, results):
+        results = [(player, result, opponent) for player, result, opponent in results]
+        updates = [(player, RESULT_STATS[result]) for player, result, _ in results]
+        self.leaderboard.record_many(updates)
+        for player, outcome in updates:
+            self.store.record_stat(player, outcome)
+        for player, result, opponent in results:
+            history = self._append_history(player, result, opponent)
+            self.store.record_result(player, result, opponent)
+            self.store.record_streaks(player, history.current_streak, history.best_streak)
+
+    # (rows, page_count) for a 1-based leaderboard page, where rows are (rank, user_id, stats);
+    # page_count is 0 while the leaderboard is empty
+    async def leaderboard_page(self, page):
+        if not self.leaderboard:
+            return [], 0
+        return self.leaderboard.page(page), self.leaderboard.page_count()
+
+    # (rank, players ranked, stats) for the player, or None if they haven't played
+    async def rank(self, user_id):
+        position = self.leaderboard.rank(user_id)
+        if position is None:
+            return None
+        return position, len(self.leaderboard), self.leaderboard.get(user_id)
+
+    # Summary of the player's last `limit` games and running counters, or None without history
+    async def history(self, user_id, limit):
+        history = self.game_history.get(user_id)
+        if not history:
+            return None
+        return {"recent": list(history.recent(limit)), "games_played": history.games_played,
+                "win_rate": history.win_rate, "current_streak": history.current_streak,
+                "best_streak": history.best_streak}
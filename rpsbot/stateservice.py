@@ -0,0 +1,335 @@
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+
+from rpsbot.registry import PlayersBusy
+from rpsbot.state import LocalState
+
+# Longest line either side will read; the snapshot of live games sent on connect is the largest message
+LINE_LIMIT = 2 ** 24
+
+
+# Protocol: one JSON object per line over a Unix socket.
+# Workers send requests {"id": n, "op": ...} answered with {"id": n, "result": ...} (or {"id": n, "busy": [...]}
+# for a failed claim, {"id": n or null, "error": ...} for a malformed one) and notifications, which carry no id and get
+# no answer.
+# The service pushes events to every worker as games are claimed and released and as the arena opens and
+# closes, and relays moves to the worker running the game they belong to, or DM moves of players in no
+# game to the worker running the open arena round.
+def _encode(message):
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+# Shared state for a sharded deployment: the one LocalState (game locks, leaderboard, history and
+# the SQLite store) that every worker process reads and writes through a StateClient.
+# A worker that disconnects or crashes has its games released.
+class StateService:
+    def __init__(self, path, stats_db):
+        self.path = path
+        self.state = LocalState(stats_db)
+        self.state.sessions.on_release = self._on_release
+        self._server = None
+        self._workers = {}  # worker name -> StreamWriter
+        self._leases = {}  # lease ID -> Lease
+        self._owners = {}  # Lease -> (lease ID, worker name)
+        self._lease_ids = itertools.count(1)
+        self._arena_worker = None  # worker running the open arena round, if any
+
+    async def start(self):
+        await self.state.open()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, self.path, limit=LINE_LIMIT)
+        print(f"State service listening on {self.path}")
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._workers.values()):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.state.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+    def _broadcast(self, message):
+        data = _encode(message)
+        for writer in self._workers.values():
+            writer.write(data)
+
+    async def _serve(self, reader, writer):
+        worker = None
+        try:
+            async for line in reader:
+                # A malformed line is answered with an error, under its request ID when one can be read,
+                # rather than dropping the connection and with it every game the worker runs
+                request_id = None
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError(f"expected a JSON object, got {type(message).__name__}")
+                    request_id = message.get("id")
+                    if message.get("op") == "hello":
+                        worker = message["worker"]
+                        self._workers[worker] = writer
+                    handler = getattr(self, f"_op_{message['op']}")
+                    response = await handler(worker, message)
+                except (KeyError, AttributeError, TypeError, ValueError) as e:
+                    print(f"Bad state service request from {worker or 'unknown worker'}: {e!r}")
+                    writer.write(_encode({"id": request_id, "error": repr(e)}))
+                    continue
+                if request_id is not None:
+                    writer.write(_encode({"id": request_id, **response}))
+        except (ConnectionError, ValueError) as e:
+            print(f"Dropping state service connection from {worker or 'unknown worker'}: {e!r}")
+        finally:
+            if worker is not None and self._workers.get(worker) is writer:
+                del self._workers[worker]
+                for lease, (_, owner) in list(self._owners.items()):
+                    if owner == worker:
+                        self.state.sessions.release(lease)
+                await self._op_arena_close(worker, {})
+            writer.close()
+
+    # Register the worker and send it every live game and the worker running the arena
+    async def _op_hello(self, worker, message):
+        return {"result": {"games": [[lease_id, list(lease.players), owner]
+                                     for lease, (lease_id, owner) in self._owners.items()],
+                           "arena": self._arena_worker}}
+
+    async def _op_claim(self, worker, message):
+        try:
+            lease = self.state.sessions.claim(message["players"], message["kind"])
+        except PlayersBusy as e:
+            return {"busy": e.players}
+        lease_id = next(self._lease_ids)
+        self._leases[lease_id] = lease
+        self._owners[lease] = (lease_id, worker)
+        self._broadcast({"event": "claimed", "lease": lease_id, "players": list(lease.players), "worker": worker})
+        return {"result": lease_id}
+
+    async def _op_release(self, worker, message):
+        lease = self._leases.get(message["lease"])
+        if lease is not None:
+            self.state.sessions.release(lease)
+        return {}
+
+    # Called by the registry for every release, including leases reclaimed by the sweeper
+    def _on_release(self, lease):
+        lease_id, _ = self._owners.pop(lease)
+        del self._leases[lease_id]
+        self._broadcast({"event": "released", "lease": lease_id})
+
+    async def _op_arena_open(self, worker, message):
+        if not await self.state.open_arena():
+            return {"result": False}
+        self._arena_worker = worker
+        self._broadcast({"event": "arena", "worker": worker})
+        return {"result": True}
+
+    async def _op_arena_close(self, worker, message):
+        if self._arena_worker is not None and self._arena_worker == worker:
+            self.state.close_arena()
+            self._arena_worker = None
+            self._broadcast({"event": "arena", "worker": None})
+        return {}
+
+    # Forward a move to the worker whose game the player is in, or a DM move from a player in no game
+    # to the worker running the arena round
+    async def _op_move(self, worker, message):
+        lease = self.state.sessions.get(message["author"])
+        if lease is not None:
+            target = self._owners[lease][1]
+        elif message["channel"] is None:
+            target = self._arena_worker
+        else:
+            target = None
+        owner = self._workers.get(target)
+        if owner is not None:
+            owner.write(_encode({"event": "move", "author": message["author"], "channel": message["channel"],
+                                 "move": message["move"]}))
+        return {}
+
+    async def _op_record(self, worker, message):
+        self.state.record_results(message["results"])
+        return {}
+
+    async def _op_leaderboard(self, worker, message):
+        return {"result": await self.state.leaderboard_page(message["page"])}
+
+    async def _op_rank(self, worker, message):
+        return {"result": await self.state.rank(message["user"])}
+
+    async def _op_history(self, worker, message):
+        return {"result": await self.state.history(message["user"], message["limit"])}
+
+
+# LocalState's interface for a worker process, backed by a StateService.
+# Every worker mirrors which players are in a game and which worker runs it, so membership checks
+# stay synchronous and DM moves or button presses arriving on the wrong shard are relayed to their game.
+# Once the connection is lost every request raises ConnectionError and on_lost() is called: the service
+# has already released this worker's games, so the worker is expected to exit and be restarted.
+class StateClient:
+    def __init__(self, path, worker, on_lost=None):
+        self.path = path
+        self.worker = worker
+        self.on_lost = on_lost
+        self._reader = None
+        self._writer = None
+        self._listener = None
+        self._requests = {}  # request ID -> future
+        self._request_ids = itertools.count(1)
+        self._owners = {}  # player_id -> worker name, for games in every process
+        self._lease_players = {}  # lease ID -> players
+        self._arena_worker = None  # worker running the open arena round, if any
+        # Callback(author_id, channel_id, move) for moves relayed from other workers
+        self.on_move = None
+
+    def __contains__(self, player_id):
+        return player_id in self._owners
+
+    # Number of players in a game run by this worker
+    @property
+    def active_players(self):
+        return sum(owner == self.worker for owner in self._owners.values())
+
+    # Number of requests waiting on the service
+    @property
+    def queue_depth(self):
+        return len(self._requests)
+
+    @property
+    def connected(self):
+        return self._listener is not None and not self._listener.done()
+
+    async def open(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path, limit=LINE_LIMIT)
+        self._listener = asyncio.create_task(self._listen())
+        snapshot = await self._request("hello", worker=self.worker)
+        for lease_id, players, owner in snapshot["games"]:
+            self._claimed(lease_id, players, owner)
+        self._arena_worker = snapshot["arena"]
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._writer is not None:
+            self._writer.close()
+            with contextlib.suppress(ConnectionError):
+                await self._writer.wait_closed()
+            self._writer = None
+
+    # Deliver moves for this worker's games that arrive elsewhere, and relay the ones for other workers' games
+    def attach(self, dispatcher):
+        dispatcher.relay = self.relay_move
+        self.on_move = dispatcher.accept
+
+    def _notify(self, op, **fields):
+        if not self.connected:
+            raise ConnectionError("Not connected to the state service")
+        self._writer.write(_encode({"op": op, **fields}))
+
+    async def _request(self, op, **fields):
+        if not self.connected:
+            raise ConnectionError("Not connected to the state service")
+        request_id = next(self._request_ids)
+        future = self._requests[request_id] = asyncio.get_running_loop().create_future()
+        self._writer.write(_encode({"id": request_id, "op": op, **fields}))
+        response = await future
+        if "busy" in response:
+            raise PlayersBusy(response["busy"])
+        if "error" in response:
+            raise RuntimeError(f"State service rejected {op}: {response['error']}")
+        return response["result"]
+
+    def _claimed(self, lease_id, players, owner):
+        self._lease_players[lease_id] = players
+        for player in players:
+            self._owners[player] = owner
+
+    def _released(self, lease_id):
+        for player in self._lease_players.pop(lease_id, ()):
+            self._owners.pop(player, None)
+
+    async def _listen(self):
+        try:
+            async for line in self._reader:
+                message = json.loads(line)
+                if "id" in message:
+                    future = self._requests.pop(message["id"], None)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+                elif message["event"] == "claimed":
+                    self._claimed(message["lease"], message["players"], message["worker"])
+                elif message["event"] == "released":
+                    self._released(message["lease"])
+                elif message["event"] == "arena":
+                    self._arena_worker = message["worker"]
+                elif message["event"] == "move" and self.on_move is not None:
+                    self.on_move(message["author"], message["channel"], message["move"])
+            print(f"{self.worker} lost its connection to the state service")
+        except (ConnectionError, ValueError, KeyError) as e:
+            print(f"{self.worker} lost its connection to the state service: {e!r}")
+        finally:
+            for future in self._requests.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("State service connection lost"))
+            self._requests.clear()
+            self._owners.clear()
+            self._lease_players.clear()
+            self._arena_worker = None
+        # Not reached when close() cancels the listener
+        if self.on_lost is not None:
+            self.on_lost()
+
+    # Hold the players for the length of an `async with` block, raising PlayersBusy if any is in a game
+    @contextlib.asynccontextmanager
+    async def lease(self, players, kind):
+        lease_id = await self._request("claim", players=list(players), kind=kind)
+        try:
+            yield lease_id
+        finally:
+            # A lost connection has already released the lease on the service
+            if self.connected:
+                self._notify("release", lease=lease_id)
+
+    # Claim the arena for a new round across every worker; returns False if a round is already open
+    async def open_arena(self):
+        return await self._request("arena_open")
+
+    def close_arena(self):
+        # A lost connection has already closed the round on the service
+        if self.connected:
+            self._notify("arena_close")
+
+    # Send a move to the worker running the player's game, or a DM move from a player in no game to the
+    # worker running the arena round; returns False if that's this worker or there is nowhere to send it
+    def relay_move(self, author_id, channel_id, move):
+        owner = self._owners.get(author_id)
+        if owner is None and channel_id is None:
+            owner = self._arena_worker
+        if owner is None or owner == self.worker:
+            return False
+        self._notify("move", author=author_id, channel=channel_id, move=move)
+        return True
+
+    def record_results(self, results):
+        self._notify("record", results=[list(row) for row in results])
+
+    async def leaderboard_page(self, page):
+        rows, page_count = await self._request("leaderboard", page=page)
+        return [tuple(row) for row in rows], page_count
+
+    async def rank(self, user_id):
+        result = await self._request("rank", user=user_id)
+        return None if result is None else tuple(result)
+
+    async def history(self, user_id, limit):
+        result = await self._request("history", user=user_id, limit=limit)
+        if result is not None:
+            result["recent"] = [tuple(game) for game in result["recent"]]
+        return result
@@ -0,0 +1,177 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    opponent_id INTEGER,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_user ON results (user_id, id);
+CREATE TABLE IF NOT EXISTS stats (
+    user_id INTEGER PRIMARY KEY,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    ties INTEGER NOT NULL DEFAULT 0,
+    current_streak INTEGER,
+    best_streak INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_stats_rank ON stats (wins DESC, ties DESC, losses);
+"""
+
+UPSERT_STATS = """
+INSERT INTO stats (user_id, wins, losses, ties) VALUES (?, ?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    ties = ties + excluded.ties
+"""
+
+# Streaks are saved as they stand after the player's latest game; NULL for players saved before they were kept
+UPSERT_STREAKS = """
+INSERT INTO stats (user_id, current_streak, best_streak) VALUES (?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET
+    current_streak = excluded.current_streak,
+    best_streak = MAX(COALESCE(best_streak, 0), excluded.best_streak)
+"""
+
+# Columns added to the stats table since it was first created
+STATS_MIGRATIONS = {"current_streak": "ALTER TABLE stats ADD COLUMN current_streak INTEGER",
+                    "best_streak": "ALTER TABLE stats ADD COLUMN best_streak INTEGER"}
+
+OUTCOME_COLUMNS = {"wins": 0, "losses": 1, "ties": 2}
+
+
+# SQLite persistence for leaderboard stats and game history.
+# Writes are queued in memory and flushed in batched transactions on a single
+# background thread, so recording a game never waits on disk I/O.
+class StatsStore:
+    def __init__(self, path, flush_interval=1.0, batch_size=1000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = []
+        self._conn = None
+        self._task = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats-store")
+
+    # Number of writes waiting to be flushed
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    async def _run_in_thread(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(stats)")}
+        for column, statement in STATS_MIGRATIONS.items():
+            if column not in columns:
+                self._conn.execute(statement)
+
+    # Open the database and start the periodic flush
+    async def open(self):
+        await self._run_in_thread(self._connect)
+        self._task = asyncio.create_task(self._flush_periodically())
+
+    # Flush outstanding writes and close the database; call on shutdown
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # A failing write loses what is still queued, but must not stop the bot from shutting down
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Couldn't save {len(self._queue)} queued stats writes on shutdown: {e!r}")
+        if self._conn is not None:
+            await self._run_in_thread(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=True)
+
+    def record_stat(self, user_id, outcome):
+        self._queue.append(("stat", user_id, outcome))
+
+    def record_streaks(self, user_id, current_streak, best_streak):
+        self._queue.append(("streaks", user_id, current_streak, best_streak))
+
+    def record_result(self, user_id, result, opponent=None):
+        self._queue.append(("result", user_id, result, opponent, time.time()))
+
+    # A failed flush is logged and the loop carries on, retrying database errors on the next flush
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                print(f"Couldn't save stats, retrying in {self.flush_interval}s: {e!r}")
+            except Exception as e:
+                print(f"Dropped a batch of stats writes that can't be saved: {e!r}")
+
+    # Write every queued change, one transaction per batch. A batch that fails with a database error
+    # was rolled back, so it goes back on the queue to be retried; any other error means it can never
+    # be written and it is dropped.
+    async def flush(self):
+        while self._queue:
+            batch, self._queue = self._queue[:self.batch_size], self._queue[self.batch_size:]
+            try:
+                await self._run_in_thread(self._write_batch, batch)
+            except sqlite3.Error:
+                self._queue[:0] = batch
+                raise
+
+    def _write_batch(self, batch):
+        results = []
+        deltas = {}
+        streaks = {}
+        for item in batch:
+            if item[0] == "result":
+                results.append(item[1:])
+            elif item[0] == "streaks":
+                _, user_id, current_streak, best_streak = item
+                streaks[user_id] = (current_streak, best_streak)
+            else:
+                _, user_id, outcome = item
+                delta = deltas.setdefault(user_id, [0, 0, 0])
+                delta[OUTCOME_COLUMNS[outcome]] += 1
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO results (user_id, result, opponent_id, played_at) VALUES (?, ?, ?, ?)", results)
+            self._conn.executemany(UPSERT_STATS, [(user_id, *delta) for user_id, delta in deltas.items()])
+            self._conn.executemany(UPSERT_STREAKS, [(user_id, *streak) for user_id, streak in streaks.items()])
+
+    def _load_stats(self):
+        return self._conn.execute("SELECT user_id, wins, losses, ties FROM stats").fetchall()
+
+    def _load_streaks(self):
+        return self._conn.execute(
+            "SELECT user_id, current_streak, best_streak FROM stats WHERE best_streak IS NOT NULL").fetchall()
+
+    def _load_history(self, limit):
+        return self._conn.execute(
+            "SELECT user_id, result, opponent_id FROM ("
+            " SELECT user_id, result, opponent_id, id,"
+            " ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id DESC) AS recent"
+            " FROM results) WHERE recent <= ? ORDER BY id", (limit,)).fetchall()
+
+    # (user_id, wins, losses, ties) for every player
+    async def load_stats(self):
+        return await self._run_in_thread(self._load_stats)
+
+    # (user_id, current_streak, best_streak) for every player whose streaks have been saved
+    async def load_streaks(self):
+        return await self._run_in_thread(self._load_streaks)
+
+    # (user_id, result, opponent_id) rows, oldest first, for each player's most recent games
+    async def load_history(self, limit=100):
+        return await self._run_in_thread(self._load_history, limit)
@@ -0,0 +1,77 @@
+import asyncio
+import heapq
+
+
+class Deadline:
+    __slots__ = ("when", "callback", "args", "cancelled")
+
+    def __init__(self, when, callback, args):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return self.when < other.when
+
+
+# Every game deadline in one heap, driven by a single loop.call_at timer armed for the earliest one,
+# instead of one asyncio timer (and wait_for task) per pending move.
+# Cancelled deadlines are dropped lazily, and the heap is compacted once they make up most of it.
+class DeadlineScheduler:
+    def __init__(self):
+        self._heap = []
+        self._cancelled = 0
+        self._timer = None
+        self._armed_for = None
+
+    # Number of live deadlines
+    def __len__(self):
+        return len(self._heap) - self._cancelled
+
+    # Run callback(*args) `delay` seconds from now; returns a Deadline that can be cancelled
+    def call_later(self, delay, callback, *args):
+        loop = asyncio.get_running_loop()
+        deadline = Deadline(loop.time() + delay, callback, args)
+        heapq.heappush(self._heap, deadline)
+        if self._armed_for is None or deadline.when < self._armed_for:
+            self._arm(loop, deadline.when)
+        return deadline
+
+    def cancel(self, deadline):
+        if deadline.cancelled:
+            return
+        deadline.cancelled = True
+        self._cancelled += 1
+        if self._cancelled > 64 and self._cancelled * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if not entry.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def _arm(self, loop, when):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_at(when, self._fire, loop)
+        self._armed_for = when
+
+    def _fire(self, loop):
+        self._timer = self._armed_for = None
+        now = loop.time()
+        while self._heap and (self._heap[0].cancelled or self._heap[0].when <= now):
+            deadline = heapq.heappop(self._heap)
+            if deadline.cancelled:
+                self._cancelled -= 1
+                continue
+            deadline.cancelled = True
+            try:
+                deadline.callback(*deadline.args)
+            except Exception as e:
+                print(f"Error in deadline callback {deadline.callback!r}: {e}")
+        if self._heap:
+            self._arm(loop, self._heap[0].when)
+
+
+# Resolve a pending future with asyncio.TimeoutError when its deadline passes
+def expire(future):
+    if not future.done():
+        future.set_exception(asyncio.TimeoutError())
@@ -0,0 +1,228 @@
+# Every way a game can end must leave nothing behind: no players in the SessionRegistry, no moves pending
+# on the MoveDispatcher and no deadlines on its DeadlineScheduler, whether the game resolves, times out,
+# can't DM a player (discord.Forbidden), hits any other exception or has its task cancelled.
+# Run from the repository root with: python -m pytest tests
+import asyncio
+import random
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from rpsbot.dispatcher import MoveDispatcher
+from rpsbot.fakegateway import FakeResponse, build_bot
+from rpsbot.registry import PlayersBusy, SessionRegistry
+from rpsbot.session import GameSession, GameState
+
+TIMEOUT = 0.05
+PLAYERS = (1, 2)
+ENDINGS = ("played", "timeout", "forbidden", "error", "cancelled")
+
+
+def make_player(user_id):
+    return SimpleNamespace(id=user_id, name=f"player-{user_id}", mention=f"<@{user_id}>")
+
+
+def forbidden():
+    return discord.Forbidden(FakeResponse(403, "Forbidden"), {"code": 50007, "message": "Cannot send messages to this user"})
+
+
+# A prompt that ends the game the given way: replying with every move, staying silent, failing to DM
+# a player or failing unexpectedly (a cancelled game is cancelled by the test itself)
+def prompt_for(ending, dispatcher, players):
+    async def send_prompts():
+        if ending == "forbidden":
+            raise forbidden()
+        if ending == "error":
+            raise RuntimeError("injected failure")
+        if ending == "played":
+            for player in players:
+                asyncio.get_running_loop().call_soon(dispatcher.submit, player, None, "rock")
+    return send_prompts
+
+
+# Run a game task to its end, cancelling it first for the "cancelled" ending; returns its exception, if any
+async def finish(task, ending):
+    await asyncio.sleep(0)
+    if ending == "cancelled":
+        task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception) as e:
+        return e
+    return None
+
+
+def assert_released(registry, dispatcher):
+    assert len(registry) == 0
+    assert len(dispatcher) == 0
+    assert len(dispatcher.scheduler) == 0
+
+
+# A multiplayer game as the game extension runs it: players claimed, then a session for their moves
+async def play_session(registry, dispatcher, send_prompts, sessions):
+    with registry.claim(PLAYERS, "multiplayer"):
+        with GameSession(dispatcher, PLAYERS, timeout=TIMEOUT) as session:
+            sessions.append(session)
+            await send_prompts()
+            moves = await session.wait_for_moves()
+            session.resolve()
+            return moves
+
+
+# A single-player game: one player claimed while waiting on their move
+async def play_single(registry, dispatcher, send_prompts):
+    with registry.claim(PLAYERS[:1], "singleplayer"):
+        await send_prompts()
+        return await dispatcher.wait_for_move(PLAYERS[0], timeout=TIMEOUT)
+
+
+async def run_session(ending):
+    registry, dispatcher, sessions = SessionRegistry(), MoveDispatcher(), []
+    task = asyncio.ensure_future(play_session(registry, dispatcher, prompt_for(ending, dispatcher, PLAYERS), sessions))
+    error = await finish(task, ending)
+    assert_released(registry, dispatcher)
+    return error, sessions[0]
+
+
+async def run_single(ending):
+    registry, dispatcher = SessionRegistry(), MoveDispatcher()
+    task = asyncio.ensure_future(play_single(registry, dispatcher, prompt_for(ending, dispatcher, PLAYERS[:1])))
+    error = await finish(task, ending)
+    assert_released(registry, dispatcher)
+    return error
+
+
+def test_session_played():
+    error, session = asyncio.run(run_session("played"))
+    assert error is None
+    assert session.state is GameState.RESOLVED
+    assert session.moves == {player: "rock" for player in PLAYERS}
+
+
+def test_session_timeout():
+    error, session = asyncio.run(run_session("timeout"))
+    assert isinstance(error, asyncio.TimeoutError)
+    assert session.state is GameState.EXPIRED
+    assert session.missing_players() == list(PLAYERS)
+
+
+def test_session_forbidden():
+    error, session = asyncio.run(run_session("forbidden"))
+    assert isinstance(error, discord.Forbidden)
+    assert session.state is GameState.CANCELLED
+
+
+def test_session_other_exception():
+    error, session = asyncio.run(run_session("error"))
+    assert isinstance(error, RuntimeError)
+    assert session.state is GameState.CANCELLED
+
+
+def test_session_cancelled():
+    error, session = asyncio.run(run_session("cancelled"))
+    assert isinstance(error, asyncio.CancelledError)
+    assert session.state is GameState.CANCELLED
+
+
+@pytest.mark.parametrize("ending, expected", [("played", None), ("timeout", asyncio.TimeoutError),
+                                              ("forbidden", discord.Forbidden), ("error", RuntimeError),
+                                              ("cancelled", asyncio.CancelledError)])
+def test_single_player_wait(ending, expected):
+    error = asyncio.run(run_single(ending))
+    assert error is None if expected is None else isinstance(error, expected)
+
+
+def test_released_players_can_play_again():
+    async def scenario():
+        registry = SessionRegistry()
+        with registry.claim(PLAYERS, "multiplayer"):
+            with pytest.raises(PlayersBusy):
+                registry.claim(PLAYERS[1:], "singleplayer")
+        registry.claim(PLAYERS[1:], "singleplayer")
+        assert registry.kind_of(PLAYERS[1]) == "singleplayer"
+
+    asyncio.run(scenario())
+
+
+def test_sweeper_reclaims_stale_leases():
+    registry = SessionRegistry(max_age=10)
+    lease = registry.claim(PLAYERS, "multiplayer")
+    assert registry.sweep(now=lease.expires_at - 1) == 0
+    assert registry.sweep(now=lease.expires_at) == 1
+    assert len(registry) == 0
+
+
+def test_scheduler_cancel_leaves_no_deadlines():
+    async def scenario():
+        dispatcher = MoveDispatcher()
+        scheduler = dispatcher.scheduler
+        fired = []
+        deadlines = [scheduler.call_later(60, fired.append, index) for index in range(200)]
+        for deadline in deadlines:
+            scheduler.cancel(deadline)
+            scheduler.cancel(deadline)
+        assert len(scheduler) == 0
+        scheduler.call_later(0, fired.append, "due")
+        await asyncio.sleep(0.01)
+        assert fired == ["due"] and len(scheduler) == 0
+
+    asyncio.run(scenario())
+
+
+# A bot with its game state and extensions loaded, as on a real startup, and a channel recording what it sends
+async def game_bot():
+    bot = build_bot("2p_rps_bot", ":memory:", "lean")
+    await bot.setup_hook()
+    bot.config.move_timeout = TIMEOUT
+    sent = []
+
+    async def send(content):
+        sent.append(content)
+
+    return bot, SimpleNamespace(id=1, send=send)
+
+
+# One game through the game extension's own play functions, ending the given way
+def play_game(bot, channel, players, ending, multiplayer):
+    game = bot.get_cog("Game")
+    player_ids = [player.id for player in players]
+    send_prompts = prompt_for(ending, bot.move_dispatcher, player_ids if multiplayer else player_ids[:1])
+    if multiplayer:
+        task = asyncio.ensure_future(game.play_multiplayer(channel, *players, send_prompts))
+    else:
+        task = asyncio.ensure_future(game.play_singleplayer(channel, players[0], send_prompts))
+    return finish(task, ending)
+
+
+async def assert_bot_released(bot):
+    await bot.outbox.drain()
+    assert bot.state.active_players == 0
+    assert len(bot.move_dispatcher) == 0
+    assert len(bot.move_dispatcher.scheduler) == 0
+    await bot.close()
+
+
+@pytest.mark.parametrize("multiplayer", [False, True], ids=["singleplayer", "multiplayer"])
+@pytest.mark.parametrize("ending", ENDINGS)
+def test_game_extension_releases_players(ending, multiplayer):
+    async def scenario():
+        bot, channel = await game_bot()
+        await play_game(bot, channel, [make_player(player) for player in PLAYERS], ending, multiplayer)
+        await assert_bot_released(bot)
+
+    asyncio.run(scenario())
+
+
+# Many games at once with every kind of ending mixed, sharing the bot's registry, dispatcher and scheduler
+def test_concurrent_games_release_players():
+    async def scenario():
+        bot, channel = await game_bot()
+        rng = random.Random(0)
+        # A channel per game, as the outbox holds each channel to Discord's rate limit
+        games = [play_game(bot, SimpleNamespace(id=game, send=channel.send), [make_player(game * 2 + 10), make_player(game * 2 + 11)],
+                           rng.choice(ENDINGS), rng.random() < 0.5) for game in range(500)]
+        await asyncio.gather(*games)
+        await assert_bot_released(bot)
+
+    asyncio.run(scenario())